@@ -0,0 +1,215 @@
+"""
+AXCL 이벤트 일괄 사전 등록 Lambda 함수
+
+HR 담당자가 직원 목록(레코드 리스트, CSV, JSONL)을 한 번에 사전 등록할 때 사용합니다.
+전화 등록과 같은 정책(connect_event_registration의 등록 엔진)으로 검증, 중복 확인,
+추첨번호 생성을 하고 등록 파일에는 한 번의 쓰기로 반영합니다.
+
+이벤트 형식:
+    {"records": [{"employeeId": "1234", "customerPhone": "+8210..."}, "5678", ...]}
+    {"body": "employeeId,customerPhone\\n1234,+8210...\\n", "format": "csv"}
+    {"s3Key": "imports/hr-2025-08.jsonl", "s3Bucket": "axcl", "format": "jsonl"}
+
+Author: AXCL Team
+Version: 1.0.0
+Last Updated: 2025-08-06
+"""
+
+import csv
+import json
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from connect_event_registration import s3, engine, BUCKET_NAME
+from registration_engine import (
+    RegistrationResult,
+    STATUS_SUCCESS,
+    STATUS_DUPLICATE,
+    STATUS_INPUT_ERROR,
+    STATUS_INVALID_FORMAT,
+)
+
+# 레코드에서 사번/전화번호/Contact ID로 인식하는 필드명 (앞에서부터 우선순위)
+EMPLOYEE_ID_FIELDS = ('employeeId', 'employee_id', 'customerInput', 'inputValue', '사번', 'empno')
+PHONE_FIELDS = ('customerPhone', 'customer_phone', 'phone')
+CONTACT_ID_FIELDS = ('contactId', 'contact_id')
+
+# 사전 등록 레코드의 기본 Contact ID (전화 등록과 구분)
+BATCH_CONTACT_ID = "batch-preregistration"
+
+
+class MalformedLine(NamedTuple):
+    """해석할 수 없는 입력 라인 (건별 INVALID_FORMAT 결과로 보고)"""
+    line_number: int
+    text: str
+
+
+def lambda_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
+    """
+    일괄 사전 등록 Handler
+
+    Args:
+        event: records / body / s3Key 중 하나를 포함한 이벤트
+        context: Lambda 실행 컨텍스트
+
+    Returns:
+        건별 결과와 요약을 포함한 응답 딕셔너리
+    """
+    try:
+        print(f"=== 📋 AXCL 일괄 사전 등록 시작 ===")
+
+        rows = list(iter_rows(read_records(event)))
+        if not rows:
+            print("❌ Error: No records provided")
+            return create_response("INPUT_ERROR", [], "등록할 직원 목록이 없습니다.")
+
+        print(f"Records: {len(rows)}")
+        # 해석할 수 없는 라인은 엔진에 넘기지 않고 건별 INVALID_FORMAT으로 보고
+        registered = iter(engine.register_batch([row for row in rows if not isinstance(row, MalformedLine)]))
+        results = [
+            RegistrationResult(STATUS_INVALID_FORMAT) if isinstance(row, MalformedLine) else next(registered)
+            for row in rows
+        ]
+
+        print(f"✅ Batch registration finished: {summarize(results)}")
+        return create_response("SUCCESS", list(zip(rows, results)))
+
+    except Exception as e:
+        print(f"❌ Unexpected error: {str(e)}")
+        return create_response("ERROR", [], "시스템 오류가 발생했습니다. 잠시 후 다시 시도해주세요.")
+
+
+def read_records(event: Dict[str, Any]) -> Iterable[Any]:
+    """이벤트에서 레코드 스트림 생성"""
+    if event.get('records') is not None:
+        return event['records']
+
+    if event.get('body'):
+        return parse_lines(event['body'].splitlines(), event.get('format'))
+
+    if event.get('s3Key'):
+        response = s3.get_object(Bucket=event.get('s3Bucket', BUCKET_NAME), Key=event['s3Key'])
+        lines = (line.decode('utf-8-sig') for line in response['Body'].iter_lines())
+        return parse_lines(lines, event.get('format') or guess_format(event['s3Key']))
+
+    return []
+
+
+def guess_format(name: str) -> Optional[str]:
+    if name.endswith('.jsonl') or name.endswith('.json'):
+        return 'jsonl'
+    if name.endswith('.csv'):
+        return 'csv'
+    return None
+
+
+def parse_lines(lines: Iterable[str], fmt: Optional[str] = None) -> Iterator[Any]:
+    """
+    CSV 또는 JSONL 라인 스트림을 레코드로 변환
+
+    형식을 지정하지 않으면 첫 줄이 '{'로 시작할 때 JSONL, 아니면 CSV로 처리합니다.
+    CSV 첫 줄이 알려진 필드명을 포함하면 헤더로 사용하고, 아니면
+    '사번[,전화번호[,Contact ID]]' 순서의 헤더 없는 CSV로 간주합니다.
+    JSON으로 해석할 수 없는 JSONL 라인은 MalformedLine(1부터 시작하는 줄 번호)으로 반환합니다.
+    """
+    numbered = enumerate(lines, start=1)
+    first_number, first = next(((n, line) for n, line in numbered if line.strip()), (0, None))
+    if first is None:
+        return
+    lines = (line for _, line in numbered)
+
+    if fmt is None:
+        fmt = 'jsonl' if first.lstrip().startswith('{') else 'csv'
+
+    if fmt == 'jsonl':
+        for line_number, line in _chain((first_number, first), numbered):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                print(f"⚠️ Malformed JSONL line {line_number}: {line.strip()[:80]}")
+                yield MalformedLine(line_number, line.strip())
+        return
+
+    header = next(csv.reader([first]))
+    known_fields = set(EMPLOYEE_ID_FIELDS + PHONE_FIELDS + CONTACT_ID_FIELDS)
+    if any(column.strip() in known_fields for column in header):
+        reader = csv.DictReader((line for line in lines if line.strip()), fieldnames=[c.strip() for c in header])
+        yield from reader
+    else:
+        for row in csv.reader(line for line in _chain(first, lines) if line.strip()):
+            yield row
+
+
+def iter_rows(records: Iterable[Any]) -> Iterator[Tuple[Optional[str], Optional[str], Optional[str]]]:
+    """레코드(dict / list / 문자열)를 (사번, 전화번호, Contact ID)로 정규화 (MalformedLine은 그대로 전달)"""
+    for record in records:
+        if isinstance(record, MalformedLine):
+            yield record
+            continue
+        if isinstance(record, dict):
+            employee_id = _first_field(record, EMPLOYEE_ID_FIELDS)
+            phone = _first_field(record, PHONE_FIELDS)
+            contact_id = _first_field(record, CONTACT_ID_FIELDS)
+        elif isinstance(record, (list, tuple)):
+            padded = [_clean(value) for value in record] + [None, None, None]
+            employee_id, phone, contact_id = padded[:3]
+        else:
+            employee_id, phone, contact_id = _clean(record), None, None
+        yield employee_id, phone, contact_id or BATCH_CONTACT_ID
+
+
+def summarize(results) -> Dict[str, int]:
+    summary = {"total": len(results), "registered": 0, "duplicate": 0, "invalid": 0}
+    for result in results:
+        if result.status == STATUS_SUCCESS:
+            summary["registered"] += 1
+        elif result.status == STATUS_DUPLICATE:
+            summary["duplicate"] += 1
+        elif result.status in (STATUS_INPUT_ERROR, STATUS_INVALID_FORMAT):
+            summary["invalid"] += 1
+    return summary
+
+
+def create_response(status: str, entries: List[Tuple[Any, Any]], message: str = "") -> Dict[str, Any]:
+    """일괄 등록 응답 생성"""
+    results = []
+    for row, result in entries:
+        if isinstance(row, MalformedLine):
+            results.append({
+                "employeeId": "",
+                "registrationStatus": result.status,
+                "lotteryNumber": "",
+                "lineNumber": row.line_number
+            })
+            continue
+        results.append({
+            "employeeId": row[0] or "",
+            "registrationStatus": result.status,
+            "lotteryNumber": result.lottery_number or ""
+        })
+    return {
+        "registrationStatus": status,
+        "summary": summarize([result for _, result in entries]),
+        "results": results,
+        "errorMessage": message if status != "SUCCESS" else ""
+    }
+
+
+def _first_field(record: Dict[str, Any], fields: Tuple[str, ...]) -> Optional[str]:
+    for field in fields:
+        value = _clean(record.get(field))
+        if value:
+            return value
+    return None
+
+
+def _clean(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    return str(value).strip() or None
+
+
+def _chain(first: Any, rest: Iterator[Any]) -> Iterator[Any]:
+    yield first
+    yield from rest
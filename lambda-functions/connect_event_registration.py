@@ -3,17 +3,32 @@ AWS Connect AXCL 이벤트 등록 Lambda 함수
 
 이 함수는 AWS Connect Contact Flow에서 사용자의 사번 입력을 받아
 S3에 저장하고 추첨번호를 생성하여 응답하는 기능을 제공합니다.
+등록 로직은 registration_engine 모듈을 사용합니다.
 
 Author: AXCL Team
-Version: 1.0.0
-Last Updated: 2025-08-03
+Version: 1.1.0
+Last Updated: 2025-08-05
 """
 
 import json
 import boto3
-from datetime import datetime, timezone
 from typing import Dict, Any, Optional
-import hashlib
+
+from registration_engine import (
+    RegistrationEngine,
+    ExtractionPolicy,
+    ValidationPolicy,
+    S3LedgerStore,
+    CSV,
+    digit_lottery_number,
+    new_registration,
+    is_warmup_event,
+    STATUS_SUCCESS,
+    STATUS_WARMUP,
+    STATUS_INPUT_ERROR,
+    STATUS_INVALID_FORMAT,
+    STATUS_DUPLICATE,
+)
 
 # AWS 서비스 클라이언트 초기화
 s3 = boto3.client('s3')
@@ -22,6 +37,42 @@ s3 = boto3.client('s3')
 BUCKET_NAME = "axcl"
 FILE_NAME = "axcl_event.txt"
 
+# 입력값/연락처/Contact ID 추출 경로 (앞에서부터 우선순위)
+EXTRACTION = ExtractionPolicy(
+    input_paths=[
+        ('params', 'inputValue'),
+        ('params', 'customerInput'),
+        ('params', 'StoredInput'),
+        ('params', 'userInput'),
+        ('attrs', 'customerInput'),
+        ('contact', 'StoredInput'),
+    ],
+    phone_paths=[
+        ('contact', 'CustomerEndpoint', 'Address'),
+        ('params', 'customerPhone'),
+        ('event', 'customerPhone'),
+    ],
+    contact_id_paths=[
+        ('contact', 'ContactId'),
+        ('event', 'contactId'),
+        ('event', 'ContactId'),
+    ]
+)
+
+# 등록 엔진: 3-8자리 사번, CSV 라인, 숫자 추출 추첨번호 (저장 실패 시 ERROR 응답)
+engine = RegistrationEngine(
+    store=S3LedgerStore(s3, BUCKET_NAME, FILE_NAME),
+    codec=CSV,
+    lottery=digit_lottery_number,
+    validation=ValidationPolicy(min_length=3, max_length=8)
+)
+
+ERROR_MESSAGES = {
+    STATUS_INPUT_ERROR: "사번을 입력해주세요.",
+    STATUS_INVALID_FORMAT: "올바른 사번을 입력해주세요. (3-8자리 숫자, 0으로 시작 가능)",
+    STATUS_DUPLICATE: "이미 등록된 사번입니다.",
+}
+
 
 def lambda_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
     """
@@ -35,36 +86,33 @@ def lambda_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
         Contact Flow 응답 딕셔너리
     """
     try:
+        # 프로비저닝된 동시성 워밍업: 등록 없이 S3 연결과 사번 캐시만 준비
+        if is_warmup_event(event):
+            report = engine.prime()
+            print(f"🔥 Warm-up: {json.dumps(report, ensure_ascii=False)}")
+            response = create_response(STATUS_WARMUP)
+            response.update(report)
+            return response
+        
         print(f"=== 📞 AWS Connect AXCL 이벤트 등록 시작 ===")
         print(f"Incoming Event: {json.dumps(event, ensure_ascii=False)}")
         
         # Contact 데이터 추출
         contact_data = extract_contact_data(event)
         customer_input = contact_data.get('customer_input')
-        customer_phone = contact_data.get('customer_phone')
-        contact_id = contact_data.get('contact_id')
-        
-        # 입력값 검증
-        if not customer_input:
-            print("❌ Error: No customer input provided")
-            return create_response("INPUT_ERROR", None, "사번을 입력해주세요.")
-        
-        # 사번 형식 검증: 3-8자리 숫자 (0으로 시작 가능)
-        if not customer_input.isdigit() or len(customer_input) < 3 or len(customer_input) > 8:
-            print(f"❌ Validation failed: {customer_input} (길이: {len(customer_input)})")
-            return create_response("INVALID_FORMAT", None, "올바른 사번을 입력해주세요. (3-8자리 숫자, 0으로 시작 가능)")
         
-        # 중복 등록 확인
-        if is_duplicate_registration(customer_input):
-            print(f"❌ Duplicate registration: {customer_input}")
-            return create_response("DUPLICATE", None, "이미 등록된 사번입니다.")
+        # 검증 -> 중복 확인 -> S3 저장 -> 추첨번호 생성
+        result = engine.register(
+            customer_input,
+            contact_data.get('customer_phone'),
+            contact_data.get('contact_id')
+        )
         
-        # S3에 데이터 저장
-        save_to_s3(customer_input, customer_phone, contact_id)
-        
-        # 추첨번호 생성
-        lottery_number = generate_lottery_number(customer_input)
+        if result.status != STATUS_SUCCESS:
+            print(f"❌ Registration rejected: {customer_input} ({result.status})")
+            return create_response(result.status, None, ERROR_MESSAGES[result.status])
         
+        lottery_number = result.lottery_number
         print(f"✅ Registration successful: {customer_input} -> {lottery_number}")
         return create_response("SUCCESS", lottery_number, f"등록이 완료되었습니다. 추첨번호: {lottery_number}")
         
@@ -75,95 +123,22 @@ def lambda_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
 
 def extract_contact_data(event: Dict[str, Any]) -> Dict[str, Optional[str]]:
     """Contact Flow 이벤트에서 필요한 데이터 추출"""
-    # 이벤트 형식 감지
-    is_simple_format = 'Details' not in event
-    
-    if is_simple_format:
-        lambda_parameters = event
-        contact_data = {}
-        attributes = {}
-    else:
-        contact_data = event.get('Details', {}).get('ContactData', {})
-        attributes = contact_data.get('Attributes', {})
-        lambda_parameters = event.get('Details', {}).get('Parameters', {})
-    
-    # 다중 경로에서 입력값 추출
-    possible_inputs = [
-        lambda_parameters.get('inputValue'),
-        lambda_parameters.get('customerInput'),
-        lambda_parameters.get('StoredInput'),
-        lambda_parameters.get('userInput'),
-        attributes.get('customerInput'),
-        contact_data.get('StoredInput'),
-    ]
-    
-    customer_input = None
-    for inp in possible_inputs:
-        if inp and str(inp).strip():
-            customer_input = str(inp).strip()
-            break
-    
-    # 연락처 번호 추출
-    customer_phone = (
-        contact_data.get('CustomerEndpoint', {}).get('Address') or
-        lambda_parameters.get('customerPhone') or
-        event.get('customerPhone')
-    )
-    
-    # Contact ID 추출
-    contact_id = (
-        contact_data.get('ContactId') or
-        event.get('contactId') or
-        event.get('ContactId')
-    )
-    
-    return {
-        'customer_input': customer_input,
-        'customer_phone': customer_phone,
-        'contact_id': contact_id
-    }
+    return EXTRACTION.extract(event)
 
 
 def is_duplicate_registration(customer_input: str) -> bool:
     """중복 등록 확인"""
     try:
-        response = s3.get_object(Bucket=BUCKET_NAME, Key=FILE_NAME)
-        content = response['Body'].read().decode('utf-8')
-        
-        for line in content.strip().split('\n'):
-            if line.strip():
-                parts = line.split(',')
-                if len(parts) >= 4 and parts[3].strip() == customer_input:
-                    return True
-        return False
-        
-    except s3.exceptions.NoSuchKey:
-        return False
+        return engine.is_registered(customer_input)
     except Exception:
         return False
 
 
 def save_to_s3(customer_input: str, customer_phone: str, contact_id: str) -> None:
     """S3에 등록 데이터 저장"""
-    timestamp = datetime.now(timezone.utc).isoformat()
-    
-    # 새 등록 라인 생성
-    new_line = f"{timestamp},{customer_phone or 'UNKNOWN'},{contact_id or 'UNKNOWN'},{customer_input}\n"
-    
     try:
-        # 기존 내용 읽기
-        try:
-            response = s3.get_object(Bucket=BUCKET_NAME, Key=FILE_NAME)
-            existing_content = response['Body'].read().decode('utf-8')
-        except s3.exceptions.NoSuchKey:
-            existing_content = ""
-        
-        # 새 내용 추가하여 저장
-        updated_content = existing_content + new_line
-        s3.put_object(Bucket=BUCKET_NAME, Key=FILE_NAME, Body=updated_content.encode('utf-8'))
-        
+        engine.append([new_registration(customer_input, customer_phone, contact_id)])
         print(f"💾 S3 저장 성공: {customer_input}")
-        
     except Exception as e:
         print(f"❌ S3 저장 실패: {str(e)}")
         raise
@@ -171,16 +146,7 @@ def save_to_s3(customer_input: str, customer_phone: str, contact_id: str) -> Non
 
 def generate_lottery_number(customer_input: str) -> str:
     """사번을 기반으로 추첨번호 생성"""
-    hash_object = hashlib.md5(customer_input.encode())
-    hash_hex = hash_object.hexdigest()
-    number_part = ''.join(filter(str.isdigit, hash_hex))
-    
-    if len(number_part) >= 4:
-        lottery_digits = number_part[:4]
-    else:
-        lottery_digits = (number_part + "0000")[:4]
-    
-    return f"L{lottery_digits}"
+    return digit_lottery_number(customer_input)
 
 
 def create_response(
@@ -1,12 +1,92 @@
 import json
 import boto3
-from datetime import datetime, timezone
+from spill_journal import SpillJournal, CircuitBreaker
+from registration_engine import (
+    RegistrationEngine,
+    ExtractionPolicy,
+    ValidationPolicy,
+    S3LedgerStore,
+    S3_CLIENT_CONFIG,
+    JSON_LINES,
+    modulo_lottery_number,
+    split_event,
+    is_warmup_event,
+    STATUS_INPUT_ERROR,
+    STATUS_INVALID_FORMAT,
+    STATUS_DUPLICATE,
+)
 
-s3 = boto3.client('s3')
+s3 = boto3.client('s3', config=S3_CLIENT_CONFIG)
 
 BUCKET_NAME = "axcl"
 FILE_NAME = "axcl_event.txt"
 
+# 고객 입력값/전화번호/Contact ID 추출 경로 (앞에서부터 우선순위)
+EXTRACTION = ExtractionPolicy(
+    input_paths=[
+        # Lambda Parameters에서 직접 전달 (최우선순위)
+        ('params', 'inputValue'),       # 새로운 파라미터명
+        ('params', 'StoredInput'),      # Contact Flow에서 직접 $.StoredInput 전달
+        ('params', 'userInput'),        # Contact Flow에서 $.StoredInput을 userInput으로 전달
+        ('params', 'userInputValue'),   # 추가 대안
+        # 직접 파라미터에서 (Simple Format)
+        ('params', 'customerInput'),
+        ('params', 'customer_input'),
+        ('params', 'employeeId'),
+        ('params', '사번'),
+        ('params', 'empno'),            # 추가 대안
+        # Contact attributes (SetAttributes에서 설정된 값들)
+        ('attrs', 'customerInput'),
+        ('attrs', 'customer_input'),
+        ('attrs', 'StoredInput'),
+        ('attrs', 'userInput'),
+        ('attrs', 'userInputValue'),
+        ('attrs', 'inputValue'),
+        ('attrs', '사번'),
+        ('attrs', 'empno'),
+        # Contact data에서 직접
+        ('contact', 'StoredInput'),
+        ('contact', 'SystemAttributes', 'StoredInput'),
+        # AWS Connect 시스템 변수들 (Standard Format)
+        ('params', '$.StoredInput'),
+        ('params', '$.External.customerInput'),
+        ('params', '$.Attributes.customerInput'),
+        ('params', '$.Attributes.StoredInput'),
+    ],
+    phone_paths=[
+        # 직접 파라미터에서 (Simple Format)
+        ('params', 'customerPhone'),
+        ('params', 'customer_phone'),
+        # Contact attributes
+        ('attrs', 'customerPhone'),
+        ('attrs', 'customer_phone'),
+        # Contact data의 표준 위치 (Standard Format)
+        ('contact', 'CustomerEndpoint', 'Address'),
+        ('contact', 'CustomerNumber'),
+        # 시스템 속성들
+        ('contact', 'SystemAttributes', 'customerPhone'),
+        # AWS Connect 시스템 변수들
+        ('params', '$.CustomerEndpoint.Address'),
+    ],
+    contact_id_paths=[
+        ('event', 'contactId'),  # 직접 파라미터에서
+        ('attrs', 'contactId'),
+        ('contact', 'ContactId'),
+        ('event', 'ContactId'),
+    ]
+)
+
+# 등록 엔진: 4-8자리 사번, JSON 라인, 해시 모듈로 추첨번호
+# S3 장애 시 등록을 /tmp 저널에 보존 (웜 호출 간 유지)
+engine = RegistrationEngine(
+    store=S3LedgerStore(s3, BUCKET_NAME, FILE_NAME),
+    codec=JSON_LINES,
+    lottery=modulo_lottery_number,
+    validation=ValidationPolicy(min_length=4, max_length=8),
+    journal=SpillJournal(),
+    breaker=CircuitBreaker()
+)
+
 def lambda_handler(event, context):
     print("=== Lambda Function Started ===")
     print("Incoming Event:", json.dumps(event, ensure_ascii=False, indent=2))
@@ -27,80 +107,40 @@ def lambda_handler(event, context):
         print("Lambda Response:", json.dumps(response, ensure_ascii=False, indent=2))
         return response
 
+    # 프로비저닝된 동시성 워밍업: 등록 없이 S3 연결과 사번 캐시만 준비
+    if is_warmup_event(event):
+        print("=== Warm-up Event Detected ===")
+        report = engine.prime()
+        return create_response(
+            status_code=200,
+            message='워밍업 완료',
+            success=report['primed'],
+            registration_status='WARMUP',
+            **report
+        )
+
     try:
         # 이벤트 구조 확인 (AWS Connect의 다양한 호출 방식 지원)
-        is_simple_format = 'Details' not in event
-        
-        if is_simple_format:
+        if 'Details' not in event:
             print("=== Simple Parameter Format Detected ===")
-            # 직접 파라미터로 전달된 경우
-            contact_data = {}
-            attributes = {}
-            lambda_parameters = event  # 이벤트 자체가 파라미터
         else:
             print("=== Standard AWS Connect Format Detected ===")
-            # 표준 AWS Connect 형식
-            contact_data = event.get('Details', {}).get('ContactData', {})
-            attributes = contact_data.get('Attributes', {})
-            lambda_parameters = event.get('Details', {}).get('Parameters', {})
-        
+
+        view = split_event(event)
+        contact_data = view['contact']
+        attributes = view['attrs']
+        lambda_parameters = view['params']
+
         print("Contact Data:", json.dumps(contact_data, ensure_ascii=False, indent=2))
         print("Attributes:", json.dumps(attributes, ensure_ascii=False, indent=2))
-        
-        # Contact ID 추출
-        contact_id = (
-            event.get('contactId') or  # 직접 파라미터에서
-            attributes.get('contactId') or 
-            contact_data.get('ContactId') or 
-            event.get('ContactId', 'unknown_contact')
-        )
 
-        # 고객 입력값 추출 (이벤트 형식에 따른 처리)
-        possible_inputs = [
-            # Lambda Parameters에서 직접 전달 (최우선순위)
-            lambda_parameters.get('inputValue'),   # 새로운 파라미터명
-            lambda_parameters.get('StoredInput'),  # Contact Flow에서 직접 $.StoredInput 전달
-            lambda_parameters.get('userInput'),    # Contact Flow에서 $.StoredInput을 userInput으로 전달
-            lambda_parameters.get('userInputValue'), # 추가 대안
-            # 직접 파라미터에서 (Simple Format)
-            lambda_parameters.get('customerInput'),
-            lambda_parameters.get('customer_input'), 
-            lambda_parameters.get('employeeId'),
-            lambda_parameters.get('사번'),
-            lambda_parameters.get('empno'),        # 추가 대안
-            # Contact attributes (SetAttributes에서 설정된 값들)
-            attributes.get('customerInput'),
-            attributes.get('customer_input'),
-            attributes.get('StoredInput'),
-            attributes.get('userInput'),
-            attributes.get('userInputValue'),
-            attributes.get('inputValue'),
-            attributes.get('사번'),
-            attributes.get('empno'),
-            # Contact data에서 직접
-            contact_data.get('StoredInput'),
-            contact_data.get('SystemAttributes', {}).get('StoredInput'),
-            contact_data.get('Attributes', {}).get('StoredInput'),
-            contact_data.get('Attributes', {}).get('customerInput'),
-            contact_data.get('Attributes', {}).get('inputValue'),
-            # Lambda Parameters에서 문자열 변환
-            str(lambda_parameters.get('inputValue', '')),
-            str(lambda_parameters.get('StoredInput', '')),
-            str(lambda_parameters.get('userInput', '')),
-            # AWS Connect 시스템 변수들 (Standard Format)
-            lambda_parameters.get('$.StoredInput'),
-            lambda_parameters.get('$.External.customerInput'),
-            lambda_parameters.get('$.Attributes.customerInput'),
-            lambda_parameters.get('$.Attributes.StoredInput'),
-        ]
-        
-        # None이 아니고 빈 문자열이 아닌 첫 번째 값 선택
-        customer_input = None
-        for i, inp in enumerate(possible_inputs):
-            if inp is not None and str(inp).strip() and str(inp).strip() != "":
-                customer_input = str(inp).strip()
-                print(f"✓ Found customer input from source {i}: '{inp}'")
-                break
+        extracted = EXTRACTION.extract(event)
+        contact_id = extracted['contact_id'] or 'unknown_contact'
+        customer_input = extracted['customer_input']
+        customer_phone = extracted['customer_phone'] or ''
+        possible_inputs = EXTRACTION.input_candidates(event)
+        if customer_input:
+            print(f"✓ Found customer input: '{customer_input}'")
         
         # 빈 문자열이 전달된 경우 추가 처리 (StoreUserInput 문제 대응)
         if not customer_input:
@@ -143,23 +183,6 @@ def lambda_handler(event, context):
             print(f"5. StoreUserInput MaxDigits 설정 확인 (현재값 확인 필요)")
             print(f"6. DTMF 톤 전송 문제 가능성 확인")
 
-        # 고객 전화번호 추출
-        customer_phone = (
-            # 직접 파라미터에서 (Simple Format)
-            lambda_parameters.get('customerPhone') or
-            lambda_parameters.get('customer_phone') or
-            # Contact attributes
-            attributes.get('customerPhone') or
-            attributes.get('customer_phone') or
-            # Contact data의 표준 위치 (Standard Format)
-            contact_data.get('CustomerEndpoint', {}).get('Address') or
-            contact_data.get('CustomerNumber') or
-            # 시스템 속성들
-            contact_data.get('SystemAttributes', {}).get('customerPhone') or
-            # AWS Connect 시스템 변수들
-            str(lambda_parameters.get('$.CustomerEndpoint.Address', ''))
-        )
-
         print(f"=== Extracted Data ===")
         print(f"Contact ID: {contact_id}")
         print(f"Customer Input: '{customer_input}' (type: {type(customer_input)})")
@@ -178,8 +201,15 @@ def lambda_handler(event, context):
             else:
                 print(f"✗ Source {i}: None/Empty")
 
-        # 고객 입력값 검증
-        if not customer_input:
+        # 검증 -> 중복 확인 -> S3 저장 (S3 장애 시 /tmp 저널에 보존)
+        customer_input = str(customer_input).strip() if customer_input else ""
+        print(f"=== Input Validation ===")
+        print(f"Cleaned Input: '{customer_input}' (length: {len(customer_input)})")
+        print(f"Is digit: {customer_input.isdigit()}")
+
+        result = engine.register(customer_input, customer_phone, contact_id)
+
+        if result.status == STATUS_INPUT_ERROR:
             print("Error: No customer input provided")
             print("Checked all possible input sources but found none")
             return create_response(
@@ -189,14 +219,8 @@ def lambda_handler(event, context):
                 registration_status='INPUT_ERROR',
                 errorMessage='사번을 입력해주세요.'
             )
-        
-        # 사번 형식 검증 (숫자만 허용, 4-8자리)
-        customer_input = str(customer_input).strip() if customer_input else ""
-        print(f"=== Input Validation ===")
-        print(f"Cleaned Input: '{customer_input}' (length: {len(customer_input)})")
-        print(f"Is digit: {customer_input.isdigit()}")
-        
-        if not customer_input.isdigit() or len(customer_input) < 4 or len(customer_input) > 8:
+
+        if result.status == STATUS_INVALID_FORMAT:
             print(f"Error: Invalid employee ID format")
             print(f"- Input: '{customer_input}'")
             print(f"- Length: {len(customer_input)}")
@@ -208,66 +232,21 @@ def lambda_handler(event, context):
                 registration_status='INVALID_FORMAT',
                 errorMessage='올바른 사번을 입력해주세요. (4-8자리 숫자)'
             )
-            
-        print(f"✓ Input validation passed: '{customer_input}'")
 
-        # 저장할 JSON 데이터
-        record = {
-            "contactId": contact_id,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "customerPhone": customer_phone,
-            "customerInput": customer_input,
-            "eventType": "lottery_registration"
-        }
-
-        # S3에 저장 (기존 파일에 추가하는 방식으로 변경)
-        try:
-            # 기존 파일 읽기 시도
-            try:
-                existing_data = s3.get_object(Bucket=BUCKET_NAME, Key=FILE_NAME)
-                existing_content = existing_data['Body'].read().decode('utf-8')
-            except s3.exceptions.NoSuchKey:
-                existing_content = ""
-            
-            # 중복 등록 확인
-            if existing_content and customer_input in existing_content:
-                # 더 정확한 중복 확인을 위해 각 라인을 파싱
-                for line in existing_content.strip().split('\n'):
-                    if line.strip():
-                        try:
-                            existing_record = json.loads(line)
-                            if existing_record.get('customerInput') == customer_input:
-                                print(f"Duplicate registration detected for employee ID: {customer_input}")
-                                return create_response(
-                                    status_code=400,
-                                    message=f'이미 등록된 사번입니다: {customer_input}',
-                                    success=False,
-                                    registration_status='DUPLICATE',
-                                    errorMessage=f'이미 등록된 사번입니다: {customer_input}'
-                                )
-                        except json.JSONDecodeError:
-                            continue
-            
-            # 새 레코드 추가
-            new_content = existing_content + json.dumps(record, ensure_ascii=False) + "\n"
-            
-            # S3에 저장
-            s3.put_object(
-                Bucket=BUCKET_NAME,
-                Key=FILE_NAME,
-                Body=new_content.encode('utf-8'),
-                ContentType='text/plain'
+        if result.status == STATUS_DUPLICATE:
+            print(f"Duplicate registration detected for employee ID: {customer_input}")
+            return create_response(
+                status_code=400,
+                message=f'이미 등록된 사번입니다: {customer_input}',
+                success=False,
+                registration_status='DUPLICATE',
+                errorMessage=f'이미 등록된 사번입니다: {customer_input}'
             )
-            
-            print(f"Successfully saved to S3: s3://{BUCKET_NAME}/{FILE_NAME}")
-            
-        except Exception as s3_error:
-            print(f"S3 operation failed: {str(s3_error)}")
-            # S3 오류가 발생해도 Contact Flow에는 성공 응답을 보냄
-            # (이벤트 등록은 성공했다고 안내)
+
+        print(f"✓ Input validation passed: '{customer_input}'")
 
         # 성공 응답 - Contact Flow에서 사용할 속성들 추가
-        lottery_number = generate_lottery_number(customer_input)
+        lottery_number = result.lottery_number
         success_message = f"이벤트가 성공적으로 등록되었습니다. 사번: {customer_input}, 추첨번호: {lottery_number}"
         
         print(f"=== Success Response ===")
@@ -298,15 +277,6 @@ def lambda_handler(event, context):
 
 def generate_lottery_number(customer_input):
     """사번을 기반으로 추첨 번호 생성"""
-    import hashlib
-    
-    # 사번을 해시하여 일관된 추첨 번호 생성
-    hash_object = hashlib.md5(customer_input.encode())
-    hash_hex = hash_object.hexdigest()
-    
-    # 해시의 앞 4자리를 숫자로 변환하여 추첨 번호로 사용
-    lottery_number = int(hash_hex[:4], 16) % 10000
-    
-    return f"L{lottery_number:04d}"
+    return modulo_lottery_number(customer_input)
 
 # 프로덕션 준비 완료 - 테스트 검증됨
\ No newline at end of file
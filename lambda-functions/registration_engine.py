@@ -0,0 +1,605 @@
+"""
+AXCL 이벤트 등록 공통 엔진
+
+두 Lambda 핸들러(lambda_function, connect_event_registration)가 공유하는
+입력 추출, 사번 검증, 중복 확인, 저장, 추첨번호 생성 로직입니다.
+핸들러별로 다른 부분은 정책 객체로 주입합니다.
+
+- ExtractionPolicy: 이벤트에서 사번/전화번호/Contact ID를 찾는 경로
+- ValidationPolicy: 사번 길이 범위
+- Codec (JsonLinesCodec / CsvCodec): 등록 파일 라인 형식
+- Store (S3LedgerStore / InMemoryLedgerStore): 등록 파일 저장소
+- Lottery (modulo_lottery_number / digit_lottery_number): 추첨번호 방식
+
+Author: AXCL Team
+Version: 1.0.0
+Last Updated: 2025-08-05
+"""
+
+import json
+import hashlib
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from spill_journal import SpillJournal, CircuitBreaker
+
+# 저널 사용 핸들러용 S3 클라이언트 설정: Connect의 Lambda 제한 시간(약 8초) 안에
+# 실패가 드러나도록 짧은 타임아웃과 SDK 재시도 없음 (재시도 여부는 서킷 브레이커가
+# 결정하고 실패분은 저널에 보존). 저널이 없는 핸들러는 SDK 기본 재시도를 사용해야
+# 일시적인 503/SlowDown이 바로 ERROR가 되지 않습니다.
+S3_CLIENT_CONFIG = Config(
+    connect_timeout=1,
+    read_timeout=2,
+    retries={'total_max_attempts': 1, 'mode': 'standard'}
+)
+
+# 등록 상태 코드 (Contact Flow 분기에 사용)
+STATUS_SUCCESS = "SUCCESS"
+STATUS_INPUT_ERROR = "INPUT_ERROR"
+STATUS_INVALID_FORMAT = "INVALID_FORMAT"
+STATUS_DUPLICATE = "DUPLICATE"
+STATUS_ERROR = "ERROR"
+STATUS_WARMUP = "WARMUP"
+
+# 프로비저닝된 동시성 워밍업/핑 이벤트 식별자
+WARMUP_SOURCES = ("serverless-plugin-warmup", "aws.events", "axcl.warmup")
+
+
+class Registration(NamedTuple):
+    """등록 레코드 한 건"""
+    timestamp: str
+    customer_phone: Optional[str]
+    contact_id: Optional[str]
+    employee_id: str
+
+
+def new_registration(
+    employee_id: str,
+    customer_phone: Optional[str] = None,
+    contact_id: Optional[str] = None
+) -> Registration:
+    """현재 시각(UTC)으로 등록 레코드 생성"""
+    return Registration(
+        timestamp=datetime.now(timezone.utc).isoformat(),
+        customer_phone=customer_phone,
+        contact_id=contact_id,
+        employee_id=employee_id
+    )
+
+
+class RegistrationResult(NamedTuple):
+    """등록 처리 결과"""
+    status: str
+    lottery_number: Optional[str] = None
+    registration: Optional[Registration] = None
+
+
+# ---------------------------------------------------------------------------
+# 입력 추출
+# ---------------------------------------------------------------------------
+
+def is_warmup_event(event: Dict[str, Any]) -> bool:
+    """프로비저닝된 동시성 워밍업/핑 이벤트 여부 (Contact Flow 이벤트는 Details 포함)"""
+    if not isinstance(event, dict) or 'Details' in event:
+        return False
+    return bool(event.get('warmup')) or event.get('source') in WARMUP_SOURCES
+
+
+class ExtractionPolicy:
+    """
+    Contact Flow 이벤트에서 값을 찾는 경로 목록
+
+    각 경로는 ('params' | 'attrs' | 'contact' | 'event', key, ...) 형태이며
+    앞에서부터 처음 발견된 비어있지 않은 값을 사용합니다.
+    """
+
+    def __init__(
+        self,
+        input_paths: Sequence[Tuple[str, ...]],
+        phone_paths: Sequence[Tuple[str, ...]],
+        contact_id_paths: Sequence[Tuple[str, ...]]
+    ):
+        self.input_paths = input_paths
+        self.phone_paths = phone_paths
+        self.contact_id_paths = contact_id_paths
+
+    def input_candidates(self, event: Dict[str, Any]) -> List[Any]:
+        """입력값 후보 목록 (디버깅 출력용)"""
+        view = split_event(event)
+        return [resolve_path(view, path) for path in self.input_paths]
+
+    def extract(self, event: Dict[str, Any]) -> Dict[str, Optional[str]]:
+        view = split_event(event)
+        return {
+            'customer_input': first_present(resolve_path(view, p) for p in self.input_paths),
+            'customer_phone': first_present(resolve_path(view, p) for p in self.phone_paths),
+            'contact_id': first_present(resolve_path(view, p) for p in self.contact_id_paths)
+        }
+
+
+def split_event(event: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """이벤트를 params/attrs/contact/event 영역으로 분리 (Simple/Standard 형식 모두 지원)"""
+    if 'Details' not in event:
+        # 직접 파라미터로 전달된 경우 이벤트 자체가 파라미터
+        return {'params': event, 'attrs': {}, 'contact': {}, 'event': event}
+
+    details = event.get('Details') or {}
+    contact_data = details.get('ContactData') or {}
+    return {
+        'params': details.get('Parameters') or {},
+        'attrs': contact_data.get('Attributes') or {},
+        'contact': contact_data,
+        'event': event
+    }
+
+
+def resolve_path(view: Dict[str, Dict[str, Any]], path: Tuple[str, ...]) -> Any:
+    value: Any = view.get(path[0])
+    for key in path[1:]:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def first_present(values: Iterator[Any]) -> Optional[str]:
+    """None/공백이 아닌 첫 번째 값을 문자열로 반환"""
+    for value in values:
+        if value is not None and str(value).strip():
+            return str(value).strip()
+    return None
+
+
+# ---------------------------------------------------------------------------
+# 사번 검증
+# ---------------------------------------------------------------------------
+
+class ValidationPolicy:
+    """사번 형식 검증: min_length-max_length 자리 숫자 (0으로 시작 가능)"""
+
+    def __init__(self, min_length: int, max_length: int):
+        self.min_length = min_length
+        self.max_length = max_length
+
+    def is_valid(self, employee_id: str) -> bool:
+        return (
+            employee_id.isdigit()
+            and self.min_length <= len(employee_id) <= self.max_length
+        )
+
+
+# ---------------------------------------------------------------------------
+# 등록 파일 라인 형식
+# ---------------------------------------------------------------------------
+
+class JsonLinesCodec:
+    """lambda_function 형식: JSON 한 줄 (customerInput 필드가 사번)"""
+
+    def encode(self, registration: Registration) -> str:
+        record = {
+            "contactId": registration.contact_id,
+            "timestamp": registration.timestamp,
+            "customerPhone": registration.customer_phone,
+            "customerInput": registration.employee_id,
+            "eventType": "lottery_registration"
+        }
+        return json.dumps(record, ensure_ascii=False) + "\n"
+
+    def decode(self, line: str) -> Optional[Registration]:
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(record, dict) or not record.get('customerInput'):
+            return None
+        return Registration(
+            timestamp=record.get('timestamp', ''),
+            customer_phone=record.get('customerPhone'),
+            contact_id=record.get('contactId'),
+            employee_id=str(record['customerInput'])
+        )
+
+
+class CsvCodec:
+    """connect_event_registration 형식: timestamp,phone,contact_id,employee_id"""
+
+    def encode(self, registration: Registration) -> str:
+        return (
+            f"{registration.timestamp},"
+            f"{registration.customer_phone or 'UNKNOWN'},"
+            f"{registration.contact_id or 'UNKNOWN'},"
+            f"{registration.employee_id}\n"
+        )
+
+    def decode(self, line: str) -> Optional[Registration]:
+        parts = line.strip().split(',')
+        if len(parts) < 4 or not parts[3].strip():
+            return None
+        return Registration(
+            timestamp=parts[0],
+            customer_phone=parts[1],
+            contact_id=parts[2],
+            employee_id=parts[3].strip()
+        )
+
+
+JSON_LINES = JsonLinesCodec()
+CSV = CsvCodec()
+
+
+def decode_line(line: str) -> Optional[Registration]:
+    """
+    등록 파일 한 줄 해석 (두 핸들러가 같은 파일에 기록하므로 두 형식 모두 지원)
+
+    Returns:
+        Registration 또는 해석 불가 시 None
+    """
+    stripped = line.strip()
+    if not stripped:
+        return None
+    if stripped.startswith('{'):
+        return JSON_LINES.decode(stripped)
+    return CSV.decode(stripped)
+
+
+def iter_registrations(content: str) -> Iterator[Registration]:
+    for line in content.split('\n'):
+        registration = decode_line(line)
+        if registration is not None:
+            yield registration
+
+
+def registered_ids(content: str) -> set:
+    """등록 파일 내용의 사번 집합"""
+    return {registration.employee_id for registration in iter_registrations(content)}
+
+
+def is_registered_in(content: str, employee_id: str) -> bool:
+    """등록 파일 내용에 해당 사번이 있는지 확인"""
+    # 부분 문자열 검사로 대부분의 신규 등록은 파싱 없이 통과
+    if not content or employee_id not in content:
+        return False
+    return any(r.employee_id == employee_id for r in iter_registrations(content))
+
+
+# ---------------------------------------------------------------------------
+# 추첨번호 방식
+# ---------------------------------------------------------------------------
+
+def modulo_lottery_number(employee_id: str) -> str:
+    """MD5 해시 앞 4자리(16진수)를 10000으로 나눈 나머지 (lambda_function 방식)"""
+    hash_hex = hashlib.md5(employee_id.encode()).hexdigest()
+    return f"L{int(hash_hex[:4], 16) % 10000:04d}"
+
+
+def digit_lottery_number(employee_id: str) -> str:
+    """MD5 해시에서 숫자만 골라 앞 4자리 사용 (connect_event_registration 방식)"""
+    hash_hex = hashlib.md5(employee_id.encode()).hexdigest()
+    number_part = ''.join(filter(str.isdigit, hash_hex))
+    return f"L{(number_part + '0000')[:4]}"
+
+
+def issued_lottery_number(line: str, employee_id: str) -> str:
+    """
+    등록 라인을 기록한 핸들러의 방식으로 추첨번호 재계산
+
+    JSON 라인은 lambda_function(모듈로 방식), CSV 라인은
+    connect_event_registration(숫자 추출 방식)이 기록합니다.
+    """
+    if line.lstrip().startswith('{'):
+        return modulo_lottery_number(employee_id)
+    return digit_lottery_number(employee_id)
+
+
+# ---------------------------------------------------------------------------
+# 저장소
+# ---------------------------------------------------------------------------
+
+class S3LedgerStore:
+    """
+    S3 단일 객체 등록 파일
+
+    마지막으로 읽거나 쓴 내용을 ETag와 함께 보관하고, 다음 읽기는 조건부 GET
+    (IfNoneMatch)으로 변경 여부만 확인합니다. 변경이 없으면 같은 문자열 객체를
+    반환하므로 엔진의 사번 캐시를 그대로 재사용할 수 있습니다.
+    """
+
+    def __init__(self, client, bucket: str, key: str):
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self._etag: Optional[str] = None
+        self._content = ""
+
+    def read(self) -> str:
+        """등록 파일 전체 내용 (파일이 없으면 빈 문자열)"""
+        kwargs = {'Bucket': self.bucket, 'Key': self.key}
+        if self._etag:
+            kwargs['IfNoneMatch'] = self._etag
+        try:
+            response = self.client.get_object(**kwargs)
+        except self.client.exceptions.NoSuchKey:
+            self._etag, self._content = None, ""
+            return ""
+        except ClientError as e:
+            if e.response.get('ResponseMetadata', {}).get('HTTPStatusCode') == 304:
+                return self._content
+            raise
+
+        self._content = response['Body'].read().decode('utf-8')
+        self._etag = response.get('ETag')
+        return self._content
+
+    def write(self, content: str) -> None:
+        response = self.client.put_object(
+            Bucket=self.bucket,
+            Key=self.key,
+            Body=content.encode('utf-8'),
+            ContentType='text/plain'
+        )
+        etag = response.get('ETag')
+        self._etag, self._content = etag, (content if etag else "")
+
+    def describe(self) -> str:
+        return f"s3://{self.bucket}/{self.key}"
+
+
+class InMemoryLedgerStore:
+    """메모리 등록 파일 (로컬 테스트 및 벤치마크용)"""
+
+    def __init__(self, content: str = ""):
+        self.content = content
+
+    def read(self) -> str:
+        return self.content
+
+    def write(self, content: str) -> None:
+        self.content = content
+
+    def describe(self) -> str:
+        return "memory://ledger"
+
+
+# ---------------------------------------------------------------------------
+# 등록 엔진
+# ---------------------------------------------------------------------------
+
+class RegistrationEngine:
+    """
+    검증 -> 중복 확인 -> 저장 -> 추첨번호 생성 파이프라인
+
+    journal을 지정하면 저장소 오류 시 레코드를 /tmp 저널에 보존하고 SUCCESS를
+    반환하며, 이후 호출에서 배치로 반영합니다. journal이 None이면 저장소 오류를
+    호출자에게 그대로 전달합니다.
+    """
+
+    def __init__(
+        self,
+        store,
+        codec,
+        lottery: Callable[[str], str],
+        validation: ValidationPolicy,
+        journal: Optional[SpillJournal] = None,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        self.store = store
+        self.codec = codec
+        self.lottery = lottery
+        self.validation = validation
+        self.journal = journal
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        # 사번 캐시: 마지막으로 해석한 등록 파일 내용과 그 사번 집합
+        self._ids_content: Optional[str] = None
+        self._ids: set = set()
+
+    def validate(self, employee_id: Optional[str]) -> Optional[str]:
+        """검증 실패 시 상태 코드, 통과 시 None"""
+        if not employee_id:
+            return STATUS_INPUT_ERROR
+        if not self.validation.is_valid(employee_id):
+            return STATUS_INVALID_FORMAT
+        return None
+
+    def is_registered(self, employee_id: str) -> bool:
+        """저널 보류분 또는 등록 파일에 사번이 있는지 확인"""
+        return self._is_pending(employee_id) or employee_id in self.registered_ids(self.store.read())
+
+    def register(
+        self,
+        employee_id: Optional[str],
+        customer_phone: Optional[str] = None,
+        contact_id: Optional[str] = None
+    ) -> RegistrationResult:
+        status = self.validate(employee_id)
+        if status:
+            return RegistrationResult(status)
+
+        # 저널에 보류 중인 등록과의 중복 확인 (S3 장애 중 재등록 방지)
+        if self._is_pending(employee_id):
+            return RegistrationResult(STATUS_DUPLICATE)
+
+        registration = new_registration(employee_id, customer_phone, contact_id)
+
+        if self.journal is not None and not self.breaker.allow_request():
+            # 서킷이 열려 있으면 저장소를 건너뛰고 바로 저널에 기록
+            if self._is_known(employee_id):
+                return RegistrationResult(STATUS_DUPLICATE)
+            print(f"⚠️ Store circuit open - spilling record to {self.journal.path}")
+            self.journal.append(registration._asdict())
+        else:
+            try:
+                self.flush_journal()
+                content = self.store.read()
+                if employee_id in self.registered_ids(content):
+                    return RegistrationResult(STATUS_DUPLICATE)
+                self._write(content + self.codec.encode(registration), [employee_id])
+                self.breaker.record_success()
+                print(f"💾 저장 성공: {self.store.describe()}")
+            except Exception as e:
+                if self.journal is None:
+                    raise
+                self.breaker.record_failure()
+                if self._is_known(employee_id):
+                    print(f"❌ 저장 실패, 마지막으로 읽은 등록 파일 기준 중복: {str(e)}")
+                    return RegistrationResult(STATUS_DUPLICATE)
+                print(f"❌ 저장 실패, 저널에 보존: {str(e)}")
+                # 저널 기록까지 실패하면 예외가 호출자에게 전달됨
+                self.journal.append(registration._asdict())
+
+        return RegistrationResult(STATUS_SUCCESS, self.lottery(employee_id), registration)
+
+    def register_batch(
+        self,
+        rows: Iterable[Tuple[Optional[str], Optional[str], Optional[str]]]
+    ) -> List[RegistrationResult]:
+        """
+        (사번, 전화번호, Contact ID) 목록 일괄 등록
+
+        검증/추첨번호 생성 후 등록 파일을 한 번 읽어 기존 등록 및 목록 내 중복을
+        제외하고 한 번의 쓰기로 반영합니다. 검증은 GIL을 잡는 순수 Python 연산이라
+        스레드로 나눠도 빨라지지 않으므로 순차 처리합니다.
+        저장소 오류는 호출자에게 그대로 전달됩니다 (저널 미사용).
+
+        Returns:
+            입력 순서와 같은 RegistrationResult 목록
+        """
+        prepared = self._prepare(rows)
+
+        content = self.store.read()
+        seen = set(self.registered_ids(content))
+        if self.journal is not None:
+            seen.update(record.get('employee_id') for record in self.journal.pending())
+
+        results = []
+        lines = []
+        new_ids = []
+        for result in prepared:
+            if result.status == STATUS_SUCCESS:
+                if result.registration.employee_id in seen:
+                    result = RegistrationResult(STATUS_DUPLICATE)
+                else:
+                    seen.add(result.registration.employee_id)
+                    new_ids.append(result.registration.employee_id)
+                    lines.append(self.codec.encode(result.registration))
+            results.append(result)
+
+        if lines:
+            self._write(content + ''.join(lines), new_ids)
+            print(f"💾 일괄 저장 성공: {len(lines)}건 -> {self.store.describe()}")
+        return results
+
+    def _prepare(
+        self,
+        rows: Iterable[Tuple[Optional[str], Optional[str], Optional[str]]]
+    ) -> List[RegistrationResult]:
+        """검증 및 추첨번호 생성 (중복 확인 전 단계)"""
+        results = []
+        for employee_id, customer_phone, contact_id in rows:
+            employee_id = str(employee_id).strip() if employee_id is not None else None
+            status = self.validate(employee_id)
+            if status:
+                results.append(RegistrationResult(status))
+                continue
+            registration = new_registration(employee_id, customer_phone, contact_id)
+            results.append(RegistrationResult(STATUS_SUCCESS, self.lottery(employee_id), registration))
+        return results
+
+    def append(self, registrations: List[Registration]) -> List[Registration]:
+        """
+        등록 레코드들을 한 번의 read-modify-write로 반영
+
+        Returns:
+            실제로 추가된 레코드 (이미 등록된 사번은 제외)
+        """
+        content = self.store.read()
+        existing = set(self.registered_ids(content))
+        added = []
+        lines = []
+        for registration in registrations:
+            if registration.employee_id in existing:
+                continue
+            existing.add(registration.employee_id)
+            added.append(registration)
+            lines.append(self.codec.encode(registration))
+
+        if lines:
+            self._write(content + ''.join(lines), [r.employee_id for r in added])
+        return added
+
+    def flush_journal(self) -> int:
+        """저널 보류분 한 배치를 반영 (재시도 없이 실패하면 예외 전달)"""
+        if self.journal is None or not self.journal.has_pending():
+            return 0
+        flushed = self.journal.flush(
+            lambda records: self.append([Registration(**record) for record in records])
+        )
+        print(f"📤 Flushed {flushed} spilled records to {self.store.describe()}")
+        return flushed
+
+    def registered_ids(self, content: str) -> set:
+        """등록 파일 내용의 사번 집합 (내용이 바뀌지 않았으면 캐시 사용, 수정 금지)"""
+        if content is not self._ids_content:
+            self._ids = registered_ids(content) if content else set()
+            self._ids_content = content
+        return self._ids
+
+    def prime(self) -> Dict[str, Any]:
+        """
+        워밍업: 저장소 연결과 사번 캐시를 미리 준비 (등록은 하지 않음)
+
+        첫 등록 호출이 S3 연결 수립, 등록 파일 다운로드, 전체 파싱 비용을
+        부담하지 않도록 합니다. 저널 보류분이 있으면 서킷이 닫혀 있을 때 한 배치를
+        반영합니다 (등록 호출이 더 오지 않는 컨테이너에서도 유실되지 않도록).
+        실패해도 예외 대신 결과에 오류를 기록합니다.
+
+        Returns:
+            단계별 소요 시간(ms), 캐시된 사번 수, 반영한 저널 레코드 수
+        """
+        started = time.perf_counter()
+        report: Dict[str, Any] = {"primed": True}
+        try:
+            if self.journal is not None and self.journal.has_pending():
+                if not self.breaker.allow_request():
+                    raise RuntimeError("store circuit open")
+                try:
+                    report["flushedRecords"] = self.flush_journal()
+                except Exception:
+                    self.breaker.record_failure()
+                    raise
+                self.breaker.record_success()
+            load_started = time.perf_counter()
+            content = self.store.read()
+            loaded = time.perf_counter()
+            ids = self.registered_ids(content)
+            report["ledgerLoadMs"] = round((loaded - load_started) * 1000, 2)
+            report["idCacheMs"] = round((time.perf_counter() - loaded) * 1000, 2)
+            report["cachedIds"] = len(ids)
+        except Exception as e:
+            print(f"⚠️ 워밍업 실패: {str(e)}")
+            report["primed"] = False
+            report["error"] = str(e)
+        report["primingMs"] = round((time.perf_counter() - started) * 1000, 2)
+        return report
+
+    def _write(self, content: str, new_ids: List[str]) -> None:
+        """
+        저장 후 사번 캐시를 새 내용 기준으로 갱신 (재파싱 없이 추가분만 반영)
+
+        호출 전에 기존 내용으로 registered_ids()가 호출되어 있어야 합니다.
+        """
+        self.store.write(content)
+        self._ids = self._ids | set(new_ids)
+        self._ids_content = content
+
+    def _is_known(self, employee_id: str) -> bool:
+        """저장소를 읽을 수 없을 때 마지막으로 해석한 등록 파일 기준 중복 여부"""
+        return self._ids_content is not None and employee_id in self._ids
+
+    def _is_pending(self, employee_id: str) -> bool:
+        if self.journal is None:
+            return False
+        return any(record.get('employee_id') == employee_id for record in self.journal.pending())
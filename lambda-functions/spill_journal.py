@@ -0,0 +1,133 @@
+"""
+S3 장애 대비 /tmp 스필 저널
+
+S3 저장이 실패하면 등록 레코드를 Lambda 컨테이너의 /tmp에 append-only로 기록하고,
+이후 웜 호출(워밍업/핑 포함)에서 배치 단위로 S3에 반영합니다. S3 호출 실패마다
+서킷 브레이커에 기록하고, 연속 실패 시 브레이커가 열려 S3 장애 동안 매 호출이
+타임아웃을 기다리지 않도록 합니다.
+
+Author: AXCL Team
+Version: 1.0.0
+Last Updated: 2025-08-05
+"""
+
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List
+
+# 설정 상수
+JOURNAL_PATH = os.environ.get("AXCL_SPILL_JOURNAL", "/tmp/axcl_spill.jsonl")
+FLUSH_BATCH_SIZE = 100
+
+
+class CircuitBreaker:
+    """S3 호출 서킷 브레이커 (CLOSED -> OPEN -> HALF_OPEN)"""
+
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = 0.0
+        self._state = self.CLOSED
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+
+    def allow_request(self) -> bool:
+        """S3 호출 허용 여부 (OPEN 상태에서는 즉시 거부)"""
+        return self.state != self.OPEN
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._state = self.OPEN
+            self._opened_at = self._clock()
+
+
+class SpillJournal:
+    """/tmp 기반 append-only 등록 저널"""
+
+    def __init__(self, path: str = JOURNAL_PATH):
+        self.path = path
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """레코드 한 줄 추가 (fsync까지 완료해야 반환)"""
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def has_pending(self) -> bool:
+        try:
+            return os.path.getsize(self.path) > 0
+        except OSError:
+            return False
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """저널에 남아 있는 레코드 목록 (잘린 마지막 줄 등 손상 라인은 무시)"""
+        if not self.has_pending():
+            return []
+
+        records = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    print(f"⚠️ 손상된 저널 라인 무시: {line.strip()[:80]}")
+        return records
+
+    def flush(
+        self,
+        writer: Callable[[List[Dict[str, Any]]], None],
+        batch_size: int = FLUSH_BATCH_SIZE
+    ) -> int:
+        """
+        저널 앞부분 batch_size개 레코드를 writer로 반영하고 저널에서 제거
+
+        요청 처리 중에 호출되므로 재시도하지 않습니다. writer가 실패하면
+        예외를 그대로 전달하고 저널 내용은 유지합니다 (재시도 여부는
+        호출자의 서킷 브레이커가 결정).
+
+        Returns:
+            반영된 레코드 수
+        """
+        records = self.pending()
+        if not records:
+            return 0
+
+        batch = records[:batch_size]
+        writer(batch)
+        self._rewrite(records[len(batch):])
+        return len(batch)
+
+    def _rewrite(self, records: List[Dict[str, Any]]) -> None:
+        """남은 레코드로 저널을 원자적으로 교체"""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,107 @@
+"""
+AXCL 등록 엔진 벤치마크
+
+두 Lambda 핸들러가 공유하는 핫 패스(추출 -> 검증 -> 중복 확인 -> 저장 -> 추첨번호)를
+메모리 저장소로 측정합니다. S3 네트워크 비용은 제외됩니다.
+
+사용법:
+    python scripts/benchmark_engine.py
+    python scripts/benchmark_engine.py --ledger-size 50000 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda-functions'))
+
+from registration_engine import (  # noqa: E402
+    RegistrationEngine,
+    ValidationPolicy,
+    InMemoryLedgerStore,
+    JSON_LINES,
+    CSV,
+    is_registered_in,
+    registered_ids,
+    modulo_lottery_number,
+    digit_lottery_number,
+    new_registration,
+)
+from connect_event_registration import EXTRACTION  # noqa: E402
+
+SAMPLE_EVENT = {
+    "Details": {
+        "ContactData": {
+            "ContactId": "bench-contact",
+            "CustomerEndpoint": {"Address": "+821012345678"}
+        },
+        "Parameters": {"inputValue": "12345678"}
+    }
+}
+
+
+def build_ledger(size: int) -> str:
+    """JSON/CSV가 절반씩 섞인 등록 파일 생성"""
+    lines = []
+    for i in range(size):
+        codec = JSON_LINES if i % 2 else CSV
+        lines.append(codec.encode(new_registration(f"{i:07d}", "+821012345678", f"contact-{i}")))
+    return ''.join(lines)
+
+
+def run(label: str, stmt, number: int, repeat: int) -> None:
+    best = min(timeit.repeat(stmt, number=number, repeat=repeat)) / number
+    print(f"{label:<40} {best * 1e6:>12.2f} µs/op")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="AXCL 등록 엔진 벤치마크")
+    parser.add_argument("--ledger-size", type=int, default=10000, help="기존 등록 건수")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 (최솟값 사용)")
+    args = parser.parse_args()
+
+    ledger = build_ledger(args.ledger_size)
+    existing_id = f"{args.ledger_size - 1:07d}"
+    validation = ValidationPolicy(min_length=3, max_length=8)
+
+    print(f"=== 등록 엔진 벤치마크 (기존 등록 {args.ledger_size}건) ===")
+    run("extract (connect policy)", lambda: EXTRACTION.extract(SAMPLE_EVENT), 10000, args.repeat)
+    run("validate", lambda: validation.is_valid("12345678"), 100000, args.repeat)
+    run("lottery modulo", lambda: modulo_lottery_number("12345678"), 100000, args.repeat)
+    run("lottery digit", lambda: digit_lottery_number("12345678"), 100000, args.repeat)
+    run("dedup miss (substring fast path)", lambda: is_registered_in(ledger, "99999999"), 100, args.repeat)
+    run("dedup hit (full parse)", lambda: is_registered_in(ledger, existing_id), 5, args.repeat)
+    run("registered_ids", lambda: registered_ids(ledger), 5, args.repeat)
+
+    primed = RegistrationEngine(
+        store=InMemoryLedgerStore(ledger),
+        codec=CSV,
+        lottery=digit_lottery_number,
+        validation=validation
+    )
+    run("prime (repeat, id cache hit)", primed.prime, 5, args.repeat)
+    run("dedup hit (primed id cache)", lambda: primed.is_registered(existing_id), 10000, args.repeat)
+
+    def register_once():
+        engine = RegistrationEngine(
+            store=InMemoryLedgerStore(ledger),
+            codec=CSV,
+            lottery=digit_lottery_number,
+            validation=validation
+        )
+        engine.register("99999999", "+821012345678", "bench-contact")
+
+    run("register (cold engine, full parse)", register_once, 20, args.repeat)
+
+    next_id = iter(range(10 ** 7, 10 ** 8))
+    run(
+        "register (primed engine)",
+        lambda: primed.register(str(next(next_id)), "+821012345678", "bench-contact"),
+        20,
+        args.repeat
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -20,7 +20,7 @@ try {
     Write-Host "`n📋 1. 코드 품질 검사 중..." -ForegroundColor Blue
     
     # Python 문법 검사
-    python -m py_compile lambda-functions/connect_event_registration.py
+    python -m py_compile lambda-functions/connect_event_registration.py lambda-functions/registration_engine.py lambda-functions/spill_journal.py lambda-functions/batch_registration.py
     if ($LASTEXITCODE -ne 0) {
         throw "Python 문법 오류가 발견되었습니다."
     }
@@ -49,6 +49,14 @@ try {
     # Lambda 함수 복사
     Copy-Item lambda-functions/connect_event_registration.py $PackageDir/lambda_function.py
     
+    # 공통 등록 엔진 모듈 복사
+    Copy-Item lambda-functions/registration_engine.py $PackageDir/
+    Copy-Item lambda-functions/spill_journal.py $PackageDir/
+    
+    # 일괄 사전 등록 핸들러 (connect_event_registration 모듈명으로 엔진을 참조)
+    Copy-Item lambda-functions/connect_event_registration.py $PackageDir/
+    Copy-Item lambda-functions/batch_registration.py $PackageDir/
+    
     # ZIP 파일 생성
     Compress-Archive -Path "$PackageDir/*" -DestinationPath $ZipFile -Force
     Remove-Item -Recurse -Force $PackageDir
@@ -0,0 +1,298 @@
+"""
+AXCL 등록 데이터 컬럼형 내보내기
+
+JSON/CSV가 섞인 등록 파일(axcl_event.txt)을 분석용 컬럼형 바이너리 파일로 변환합니다.
+분석/추첨 도구는 텍스트를 다시 파싱하지 않고 mmap으로 열어 바로 사용할 수 있습니다.
+
+파일 구조 (리틀 엔디언, 각 섹션은 8바이트 정렬):
+
+    헤더       magic "AXCLCOL1", version, 사번 폭, 전화번호 사전 크기, 레코드 수, 섹션 오프셋
+    사번       레코드 수 x 사번 폭 바이트 (ASCII, 빈 자리는 NUL)
+    추첨번호   레코드 수 x uint16 (L#### 의 숫자 부분)
+    시각       레코드 수 x int64 (UTC epoch 마이크로초, 해석 불가 시 TIMESTAMP_NULL)
+    전화번호   레코드 수 x uint32 (사전 인덱스)
+    사전 오프셋 (사전 크기 + 1) x uint32
+    사전 본문   UTF-8 전화번호 문자열 연결
+
+숫자 컬럼은 memoryview.cast로 복사 없이 읽을 수 있으며, numpy가 있다면
+np.frombuffer(..., offset=섹션 오프셋)으로도 같은 영역을 그대로 사용할 수 있습니다.
+
+사용법:
+    python scripts/export_columnar.py s3://axcl/axcl_event.txt -o registrations.axcol
+    python scripts/export_columnar.py ./axcl_event.txt -o registrations.axcol --keep-duplicates
+"""
+
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda-functions'))
+
+from registration_engine import decode_line, issued_lottery_number  # noqa: E402
+
+# 파일 형식 상수
+MAGIC = b"AXCLCOL1"
+VERSION = 1
+EMPLOYEE_ID_WIDTH = 8
+TIMESTAMP_NULL = -(2 ** 63)
+UNKNOWN_PHONE = ""
+
+# magic, version, 사번 폭, 사전 크기, 레코드 수, 섹션 오프셋 6개
+HEADER = struct.Struct("<8sHHIQ6Q")
+ALIGNMENT = 8
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+# ---------------------------------------------------------------------------
+# 내보내기
+# ---------------------------------------------------------------------------
+
+def read_ledger_lines(location: str) -> Iterator[str]:
+    """등록 파일 라인 스트림 (로컬 경로 또는 s3://bucket/key)"""
+    if location.startswith("s3://"):
+        import boto3
+        bucket, _, key = location[len("s3://"):].partition("/")
+        response = boto3.client('s3').get_object(Bucket=bucket, Key=key)
+        for line in response['Body'].iter_lines():
+            yield line.decode("utf-8", errors="replace")
+        return
+
+    with open(location, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            yield line
+
+
+def to_epoch_micros(timestamp: Optional[str]) -> int:
+    """ISO 8601 시각을 UTC epoch 마이크로초로 변환 (해석 불가 시 TIMESTAMP_NULL)"""
+    if not timestamp:
+        return TIMESTAMP_NULL
+    try:
+        parsed = datetime.fromisoformat(timestamp.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return TIMESTAMP_NULL
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    delta = parsed - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+class ColumnBuilder:
+    """등록 레코드를 컬럼 배열로 누적"""
+
+    def __init__(self, keep_duplicates: bool = False):
+        self.keep_duplicates = keep_duplicates
+        self.employee_ids = bytearray()
+        self.lottery_numbers = array("H")
+        self.timestamps = array("q")
+        self.phone_codes = array("I")
+        self.phone_index: Dict[str, int] = {}
+        self.seen = set()
+        self.skipped = {"malformed": 0, "duplicate": 0, "unsupported": 0}
+
+    def __len__(self) -> int:
+        return len(self.lottery_numbers)
+
+    def add_line(self, line: str) -> None:
+        registration = decode_line(line)
+        if registration is None:
+            if line.strip():
+                self.skipped["malformed"] += 1
+            return
+
+        employee_id = registration.employee_id
+        encoded_id = employee_id.encode("ascii", errors="replace")
+        if len(encoded_id) > EMPLOYEE_ID_WIDTH:
+            self.skipped["unsupported"] += 1
+            return
+        if not self.keep_duplicates:
+            if employee_id in self.seen:
+                self.skipped["duplicate"] += 1
+                return
+            self.seen.add(employee_id)
+
+        phone = registration.customer_phone
+        if not phone or phone == "UNKNOWN":
+            phone = UNKNOWN_PHONE
+        code = self.phone_index.get(phone)
+        if code is None:
+            code = self.phone_index[phone] = len(self.phone_index)
+
+        self.employee_ids += encoded_id.ljust(EMPLOYEE_ID_WIDTH, b"\0")
+        self.lottery_numbers.append(int(issued_lottery_number(line, employee_id)[1:]))
+        self.timestamps.append(to_epoch_micros(registration.timestamp))
+        self.phone_codes.append(code)
+
+    def write(self, path: str) -> None:
+        """컬럼형 파일 기록 (임시 파일에 쓴 뒤 원자적으로 교체)"""
+        for column in (self.lottery_numbers, self.timestamps, self.phone_codes):
+            if sys.byteorder != "little":
+                column.byteswap()
+
+        phones = [phone.encode("utf-8") for phone in self.phone_index]
+        dict_offsets = array("I", [0])
+        for phone in phones:
+            dict_offsets.append(dict_offsets[-1] + len(phone))
+        if sys.byteorder != "little":
+            dict_offsets.byteswap()
+
+        sections = [
+            bytes(self.employee_ids),
+            self.lottery_numbers.tobytes(),
+            self.timestamps.tobytes(),
+            self.phone_codes.tobytes(),
+            dict_offsets.tobytes(),
+            b"".join(phones),
+        ]
+        offsets = []
+        position = _align(HEADER.size)
+        for section in sections:
+            offsets.append(position)
+            position = _align(position + len(section))
+
+        header = HEADER.pack(MAGIC, VERSION, EMPLOYEE_ID_WIDTH, len(phones), len(self), *offsets)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            for offset, section in zip(offsets, sections):
+                f.write(b"\0" * (offset - f.tell()))
+                f.write(section)
+        os.replace(tmp_path, path)
+
+
+def export(
+    lines: Iterable[str],
+    path: str,
+    keep_duplicates: bool = False
+) -> Dict[str, Any]:
+    """
+    등록 라인을 컬럼형 파일로 내보내기
+
+    Args:
+        lines: 등록 파일 라인 스트림 (JSON/CSV 혼재 가능)
+        path: 출력 파일 경로
+        keep_duplicates: False면 사번별 첫 등록만 기록
+
+    Returns:
+        기록 건수, 전화번호 사전 크기, 제외 건수
+    """
+    builder = ColumnBuilder(keep_duplicates=keep_duplicates)
+    for line in lines:
+        builder.add_line(line)
+    builder.write(path)
+    return {"records": len(builder), "phones": len(builder.phone_index), "skipped": builder.skipped}
+
+
+def _align(position: int) -> int:
+    return (position + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+# ---------------------------------------------------------------------------
+# 읽기 (mmap, 복사 없음)
+# ---------------------------------------------------------------------------
+
+class ColumnarRegistrations:
+    """
+    컬럼형 등록 파일 리더
+
+    숫자 컬럼(lottery_numbers, timestamps, phone_codes)은 mmap 위의 memoryview이며
+    파일을 열 때 파싱이나 복사가 일어나지 않습니다. close() 전에 외부에서
+    잡고 있는 memoryview는 먼저 해제해야 합니다.
+    """
+
+    def __init__(self, path: str):
+        if sys.byteorder != "little":
+            raise ValueError("컬럼형 파일의 zero-copy 읽기는 리틀 엔디언 환경만 지원합니다.")
+
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        magic, version, id_width, dict_count, count, *offsets = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"AXCL 컬럼형 파일이 아닙니다: {path}")
+
+        ids_at, lottery_at, timestamps_at, phones_at, dict_offsets_at, dict_blob_at = offsets
+        self.count = count
+        self.id_width = id_width
+        self.employee_id_bytes = self._view[ids_at:ids_at + count * id_width]
+        self.lottery_numbers = self._view[lottery_at:lottery_at + count * 2].cast("H")
+        self.timestamps = self._view[timestamps_at:timestamps_at + count * 8].cast("q")
+        self.phone_codes = self._view[phones_at:phones_at + count * 4].cast("I")
+        self._dict_offsets = self._view[dict_offsets_at:dict_offsets_at + (dict_count + 1) * 4].cast("I")
+        self._dict_blob_at = dict_blob_at
+        self._phones: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __enter__(self) -> "ColumnarRegistrations":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def phones(self) -> List[str]:
+        """전화번호 사전 (처음 접근 시 한 번만 디코딩)"""
+        if self._phones is None:
+            blob = self._mmap
+            base = self._dict_blob_at
+            offsets = self._dict_offsets
+            self._phones = [
+                blob[base + offsets[i]:base + offsets[i + 1]].decode("utf-8")
+                for i in range(len(offsets) - 1)
+            ]
+        return self._phones
+
+    def employee_id(self, index: int) -> str:
+        start = index * self.id_width
+        return bytes(self.employee_id_bytes[start:start + self.id_width]).rstrip(b"\0").decode("ascii")
+
+    def lottery_number(self, index: int) -> str:
+        return f"L{self.lottery_numbers[index]:04d}"
+
+    def timestamp(self, index: int) -> Optional[datetime]:
+        micros = self.timestamps[index]
+        if micros == TIMESTAMP_NULL:
+            return None
+        # 정수 연산으로 변환해 마이크로초까지 정확히 복원 (float 경유 시 손실 가능)
+        return EPOCH + timedelta(microseconds=micros)
+
+    def phone(self, index: int) -> str:
+        return self.phones[self.phone_codes[index]]
+
+    def draw(self, winners: int, seed: Optional[int] = None) -> List[Tuple[str, str]]:
+        """추첨: 등록자 중 winners명을 무작위로 선택해 (사번, 추첨번호) 반환"""
+        picked = random.Random(seed).sample(range(self.count), min(winners, self.count))
+        return [(self.employee_id(i), self.lottery_number(i)) for i in picked]
+
+    def close(self) -> None:
+        for name in ("employee_id_bytes", "lottery_numbers", "timestamps", "phone_codes", "_dict_offsets", "_view"):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+        self._mmap.close()
+        self._file.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="AXCL 등록 데이터 컬럼형 내보내기")
+    parser.add_argument("ledger", help="등록 파일 경로 또는 s3://bucket/key")
+    parser.add_argument("-o", "--output", required=True, help="출력 컬럼형 파일 경로")
+    parser.add_argument("--keep-duplicates", action="store_true", help="중복 사번도 모두 기록")
+    args = parser.parse_args()
+
+    summary = export(read_ledger_lines(args.ledger), args.output, keep_duplicates=args.keep_duplicates)
+    print(f"✅ 내보내기 완료: {args.output}")
+    print(f"   레코드: {summary['records']}, 전화번호 사전: {summary['phones']}, 제외: {summary['skipped']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,500 @@
+"""
+AXCL 등록 파일 정합성 점검 및 대사(reconciliation) 도구
+
+등록 파일(axcl_event.txt)을 바이트 범위 청크로 나눠 프로세스 풀에서 병렬로 읽고
+다음 항목을 보고합니다.
+
+- 중복 사번: 같은 사번이 여러 줄에 기록된 경우 (read-modify-write 경합)
+- 손상 라인: JSON/CSV 어느 형식으로도 해석되지 않는 줄
+- 추첨번호 충돌: 서로 다른 사번이 같은 추첨번호를 받은 경우
+- 누락 등록: Connect 컨택 로그에는 있으나 등록 파일에 없는 Contact ID
+  (삼켜진 S3 오류로 유실된 등록 후보)
+
+청크 결과는 키 해시로 분할한 spill 파일에 기록하고 파티션 단위로 집계하므로
+등록 파일 크기와 관계없이 메모리 사용량이 파티션 크기로 제한됩니다.
+
+추첨번호는 라인 형식으로 발급한 핸들러를 판단해 다시 계산합니다.
+(JSON 라인: lambda_function의 모듈로 방식, CSV 라인: connect_event_registration의 숫자 추출 방식)
+
+사용법:
+    python scripts/reconcile_ledger.py s3://axcl/axcl_event.txt
+    python scripts/reconcile_ledger.py ./axcl_event.txt --contact-log ./ctr-2025-08-04.csv --workers 8
+"""
+
+import argparse
+import csv
+import heapq
+import json
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda-functions'))
+
+from registration_engine import decode_line, issued_lottery_number  # noqa: E402
+
+# 설정 상수
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+DEFAULT_PARTITIONS = 64
+DEFAULT_SAMPLE_LIMIT = 100
+TAIL_READ_SIZE = 4096
+
+# spill 레코드 종류 (파티션 파일의 첫 컬럼)
+KIND_EMPLOYEE = "E"   # 사번, 라인 오프셋
+KIND_LOTTERY = "L"    # 추첨번호, 사번
+KIND_LEDGER_CONTACT = "C"   # 등록 파일의 Contact ID
+KIND_LOG_CONTACT = "G"      # 컨택 로그의 Contact ID
+
+CONTACT_ID_COLUMNS = ("ContactId", "contactId", "contact_id", "Contact ID")
+
+
+# ---------------------------------------------------------------------------
+# 바이트 범위 읽기
+# ---------------------------------------------------------------------------
+
+class LocalSource:
+    """로컬 파일 (mmap으로 범위 읽기)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._mmap = None
+
+    def size(self) -> int:
+        return os.path.getsize(self.path)
+
+    def read_range(self, start: int, end: int) -> bytes:
+        if end <= start:
+            return b""
+        if self._mmap is None:
+            self._file = open(self.path, "rb")
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap[start:end]
+
+    def describe(self) -> str:
+        return self.path
+
+    def __getstate__(self):
+        # mmap은 프로세스 간 전달 불가 - 작업 프로세스에서 다시 연다
+        return {'path': self.path, '_file': None, '_mmap': None}
+
+
+class S3Source:
+    """S3 객체 (ranged GET으로 범위 읽기)"""
+
+    def __init__(self, bucket: str, key: str):
+        self.bucket = bucket
+        self.key = key
+        self._client = None
+
+    @property
+    def client(self):
+        # 프로세스마다 별도 클라이언트 사용 (fork 이후 공유 금지)
+        if self._client is None:
+            import boto3
+            self._client = boto3.client('s3')
+        return self._client
+
+    def size(self) -> int:
+        return self.client.head_object(Bucket=self.bucket, Key=self.key)['ContentLength']
+
+    def read_range(self, start: int, end: int) -> bytes:
+        if end <= start:
+            return b""
+        response = self.client.get_object(Bucket=self.bucket, Key=self.key, Range=f"bytes={start}-{end - 1}")
+        return response['Body'].read()
+
+    def describe(self) -> str:
+        return f"s3://{self.bucket}/{self.key}"
+
+    def __getstate__(self):
+        return {'bucket': self.bucket, 'key': self.key, '_client': None}
+
+
+def open_source(location: str):
+    if location.startswith("s3://"):
+        bucket, _, key = location[len("s3://"):].partition("/")
+        return S3Source(bucket, key)
+    return LocalSource(location)
+
+
+def owned_lines(source, start: int, end: int, size: int) -> Iterator[Tuple[int, bytes]]:
+    """
+    [start, end) 범위에서 시작하는 줄을 (오프셋, 내용)으로 반환
+
+    앞 청크에서 시작한 줄은 건너뛰고, 범위 끝에 걸친 줄은 줄바꿈까지 더 읽어
+    모든 줄이 정확히 한 청크에서만 처리되도록 합니다.
+    """
+    # lead[0]은 start 직전 바이트 (start == 0이면 가상의 줄바꿈)
+    lead = source.read_range(start - 1, end) if start > 0 else b"\n" + source.read_range(0, end)
+    first_newline = lead.find(b"\n")
+    if first_newline == -1 or first_newline + 1 >= len(lead):
+        return
+
+    body = lead[first_newline + 1:]
+    if not lead.endswith(b"\n"):
+        position = end
+        while position < size:
+            tail = source.read_range(position, min(position + TAIL_READ_SIZE, size))
+            newline = tail.find(b"\n")
+            if newline != -1:
+                body += tail[:newline + 1]
+                break
+            body += tail
+            position += len(tail)
+
+    base = start + first_newline
+    position = 0
+    while position < len(body):
+        newline = body.find(b"\n", position)
+        if newline == -1:
+            newline = len(body)
+        yield base + position, body[position:newline]
+        position = newline + 1
+
+
+# ---------------------------------------------------------------------------
+# 청크 스캔 (프로세스 풀 작업)
+# ---------------------------------------------------------------------------
+
+def partition_of(key: str, partitions: int) -> int:
+    """프로세스 간에 일관된 파티션 번호 (hash()는 프로세스마다 달라 사용 불가)"""
+    return zlib.crc32(key.encode("utf-8")) % partitions
+
+
+def spill_path(work_dir: str, partition: int, chunk_index: int) -> str:
+    return os.path.join(work_dir, f"part{partition:04d}-chunk{chunk_index:06d}.tsv")
+
+
+class SpillWriter:
+    """청크별 파티션 spill 파일 기록기"""
+
+    def __init__(self, work_dir: str, chunk_index: int, partitions: int):
+        self.work_dir = work_dir
+        self.chunk_index = chunk_index
+        self.partitions = partitions
+        self._files: Dict[int, Any] = {}
+
+    def write(self, kind: str, key: str, value: str = "") -> None:
+        partition = partition_of(key, self.partitions)
+        handle = self._files.get(partition)
+        if handle is None:
+            path = spill_path(self.work_dir, partition, self.chunk_index)
+            handle = self._files[partition] = open(path, "w", encoding="utf-8")
+        handle.write(f"{kind}\t{_clean(key)}\t{_clean(value)}\n")
+
+    def close(self) -> None:
+        for handle in self._files.values():
+            handle.close()
+
+
+def scan_chunk(task: Dict[str, Any]) -> Dict[str, Any]:
+    """청크 하나를 읽어 spill 파일에 기록하고 통계를 반환"""
+    source = task["source"]
+    stats = {"lines": 0, "records": 0, "json": 0, "csv": 0, "malformed": 0, "malformedSamples": []}
+    writer = SpillWriter(task["work_dir"], task["chunk_index"], task["partitions"])
+    try:
+        for offset, raw in owned_lines(source, task["start"], task["end"], task["size"]):
+            text = raw.decode("utf-8-sig", errors="replace").strip()
+            if not text:
+                continue
+            if task["mode"] == "contacts":
+                contact_id = _contact_id_from_line(text, task.get("contact_column"))
+                if contact_id and offset != task.get("header_offset"):
+                    writer.write(KIND_LOG_CONTACT, contact_id)
+                continue
+
+            stats["lines"] += 1
+            registration = decode_line(text)
+            if registration is None:
+                stats["malformed"] += 1
+                if len(stats["malformedSamples"]) < task["sample_limit"]:
+                    stats["malformedSamples"].append({"offset": offset, "line": text[:200]})
+                continue
+
+            is_json = text.startswith("{")
+            stats["records"] += 1
+            stats["json" if is_json else "csv"] += 1
+            lottery = issued_lottery_number(text, registration.employee_id)
+
+            writer.write(KIND_EMPLOYEE, registration.employee_id, str(offset))
+            writer.write(KIND_LOTTERY, lottery, registration.employee_id)
+            if registration.contact_id and registration.contact_id != "UNKNOWN":
+                writer.write(KIND_LEDGER_CONTACT, registration.contact_id)
+    finally:
+        writer.close()
+    return stats
+
+
+def _contact_id_from_line(text: str, column: Optional[int]) -> Optional[str]:
+    if text.startswith("{"):
+        try:
+            record = json.loads(text)
+        except json.JSONDecodeError:
+            return None
+        for name in CONTACT_ID_COLUMNS:
+            if record.get(name):
+                return str(record[name]).strip()
+        return None
+    row = next(csv.reader([text]), [])
+    index = column if column is not None else 0
+    return row[index].strip() if index < len(row) and row[index].strip() else None
+
+
+# 보고서 샘플 정렬 기준 (파티션과 부모 프로세스가 같은 기준으로 top-k 병합)
+def _by_offset(sample: Dict[str, Any]) -> int:
+    return sample["offset"]
+
+
+def _by_first_offset(item: Dict[str, Any]) -> int:
+    return item["offsets"][0]
+
+
+def _by_lottery_number(item: Dict[str, Any]) -> str:
+    return item["lotteryNumber"]
+
+
+def _clean(value: str) -> str:
+    return str(value).replace("\t", " ").replace("\n", " ")
+
+
+# ---------------------------------------------------------------------------
+# 파티션 집계 (프로세스 풀 작업)
+# ---------------------------------------------------------------------------
+
+def reduce_partition(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    파티션 하나의 spill 파일을 모아 중복/충돌/누락 집계
+
+    부모 프로세스로는 건수와 항목별 최대 sample_limit개 샘플만 반환합니다.
+    """
+    limit = task["sample_limit"]
+    offsets: Dict[str, List[int]] = {}
+    lottery_ids: Dict[str, set] = {}
+    ledger_contacts = set()
+    log_contacts = set()
+
+    # 이번 실행에서 계획한 청크의 spill 파일만 읽음 (청크에 해당 파티션 키가 없으면 파일 없음)
+    for chunk_index in range(task["chunk_count"]):
+        path = spill_path(task["work_dir"], task["partition"], chunk_index)
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                kind, key, value = line.rstrip("\n").split("\t", 2)
+                if kind == KIND_EMPLOYEE:
+                    offsets.setdefault(key, []).append(int(value))
+                elif kind == KIND_LOTTERY:
+                    lottery_ids.setdefault(key, set()).add(value)
+                elif kind == KIND_LEDGER_CONTACT:
+                    ledger_contacts.add(key)
+                elif kind == KIND_LOG_CONTACT:
+                    log_contacts.add(key)
+
+    duplicates = [(employee_id, found) for employee_id, found in offsets.items() if len(found) > 1]
+    collisions = [(lottery, ids) for lottery, ids in lottery_ids.items() if len(ids) > 1]
+    missing = log_contacts - ledger_contacts
+
+    return {
+        "duplicates": {
+            "count": len(duplicates),
+            "samples": heapq.nsmallest(limit, (
+                {"employeeId": employee_id, "count": len(found), "offsets": heapq.nsmallest(limit, found)}
+                for employee_id, found in duplicates
+            ), key=_by_first_offset)
+        },
+        "lotteryCollisions": {
+            "count": len(collisions),
+            "samples": heapq.nsmallest(limit, (
+                {"lotteryNumber": lottery, "count": len(ids), "employeeIds": heapq.nsmallest(limit, ids)}
+                for lottery, ids in collisions
+            ), key=_by_lottery_number)
+        },
+        "missingContacts": {"count": len(missing), "samples": heapq.nsmallest(limit, missing)},
+        "uniqueEmployees": len(offsets)
+    }
+
+
+# ---------------------------------------------------------------------------
+# 대사 실행
+# ---------------------------------------------------------------------------
+
+def plan_chunks(source, mode: str, chunk_size: int, **extra) -> List[Dict[str, Any]]:
+    size = source.size()
+    return [
+        dict(extra, source=source, mode=mode, start=start, end=min(start + chunk_size, size), size=size)
+        for start in range(0, size, chunk_size)
+    ]
+
+
+def detect_contact_column(source) -> Tuple[Optional[int], Optional[int]]:
+    """
+    컨택 로그 CSV의 Contact ID 컬럼 위치
+
+    CSV 첫 줄은 컬럼명을 알아보지 못해도 헤더로 간주해 건너뜁니다.
+
+    Returns:
+        (컬럼 인덱스, 헤더 줄 오프셋) - 컬럼명을 모르면 인덱스 None(첫 컬럼 사용),
+        JSONL이거나 빈 파일이면 (None, None)
+    """
+    lines = owned_lines(source, 0, min(source.size(), TAIL_READ_SIZE), source.size())
+    first = next(((offset, raw) for offset, raw in lines if raw.strip()), None)
+    if first is None:
+        return None, None
+    offset, raw = first
+    text = raw.decode("utf-8-sig", errors="replace").strip()
+    if text.startswith("{"):
+        return None, None
+    header = [column.strip() for column in next(csv.reader([text]), [])]
+    for name in CONTACT_ID_COLUMNS:
+        if name in header:
+            return header.index(name), offset
+    return None, offset
+
+
+def reconcile(
+    ledger: str,
+    contact_log: Optional[str] = None,
+    workers: int = os.cpu_count() or 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    partitions: int = DEFAULT_PARTITIONS,
+    sample_limit: int = DEFAULT_SAMPLE_LIMIT,
+    work_dir: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    등록 파일 대사 실행
+
+    Args:
+        ledger: 등록 파일 경로 또는 s3://bucket/key
+        contact_log: Connect 컨택 로그 (CSV 또는 JSONL, 경로 또는 s3://)
+        workers: 프로세스 수 (1이면 현재 프로세스에서 실행)
+        chunk_size: 청크 바이트 크기
+        partitions: spill 파티션 수 (클수록 파티션당 메모리 감소)
+        sample_limit: 항목별 보고 최대 건수
+        work_dir: spill 파일을 둘 상위 디렉토리 (지정 시 그 아래 실행별 하위 디렉토리를
+            새로 만들고 삭제하지 않음, 없으면 임시 디렉토리 생성 후 삭제)
+
+    Returns:
+        대사 결과 보고서 딕셔너리
+    """
+    own_work_dir = work_dir is None
+    if work_dir is not None:
+        # 이전 실행의 spill 파일이 섞이지 않도록 실행마다 새 하위 디렉토리 사용
+        os.makedirs(work_dir, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix="axcl-reconcile-", dir=work_dir)
+    common = {"work_dir": work_dir, "partitions": partitions, "sample_limit": sample_limit}
+
+    try:
+        ledger_source = open_source(ledger)
+        tasks = plan_chunks(ledger_source, "ledger", chunk_size, **common)
+        if contact_log:
+            log_source = open_source(contact_log)
+            column, header_offset = detect_contact_column(log_source)
+            tasks += plan_chunks(
+                log_source, "contacts", chunk_size,
+                contact_column=column, header_offset=header_offset, **common
+            )
+        for index, task in enumerate(tasks):
+            task["chunk_index"] = index
+
+        reduce_tasks = [
+            {"work_dir": work_dir, "partition": p, "chunk_count": len(tasks), "sample_limit": sample_limit}
+            for p in range(partitions)
+        ]
+        # 작업 결과는 도착하는 대로 건수 + top-k 샘플로 병합 (등록 파일 크기와 무관한 메모리)
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            run = pool.map if pool is not None else map
+            chunk_summary = merge_chunk_stats(run(scan_chunk, tasks), sample_limit)
+            partition_summary = merge_partition_results(run(reduce_partition, reduce_tasks), sample_limit)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        return build_report(ledger, contact_log, chunk_summary, partition_summary)
+    finally:
+        if own_work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def merge_chunk_stats(chunk_stats: Iterable[Dict[str, Any]], sample_limit: int) -> Dict[str, Any]:
+    """청크 통계 합산 (손상 라인 샘플은 오프셋 순 top-k만 유지)"""
+    totals: Dict[str, Any] = {"lines": 0, "records": 0, "json": 0, "csv": 0, "malformed": 0, "malformedSamples": []}
+    for stats in chunk_stats:
+        for name in ("lines", "records", "json", "csv", "malformed"):
+            totals[name] += stats[name]
+        totals["malformedSamples"] = heapq.nsmallest(
+            sample_limit, totals["malformedSamples"] + stats["malformedSamples"], key=_by_offset
+        )
+    return totals
+
+
+def merge_partition_results(partition_results: Iterable[Dict[str, Any]], sample_limit: int) -> Dict[str, Any]:
+    """파티션 결과 병합 (항목별 건수 합산, 샘플은 top-k만 유지)"""
+    orders = {"duplicates": _by_first_offset, "lotteryCollisions": _by_lottery_number, "missingContacts": None}
+    merged: Dict[str, Any] = {name: {"count": 0, "samples": []} for name in orders}
+    merged["uniqueEmployees"] = 0
+    for result in partition_results:
+        merged["uniqueEmployees"] += result["uniqueEmployees"]
+        for name, order in orders.items():
+            merged[name]["count"] += result[name]["count"]
+            merged[name]["samples"] = heapq.nsmallest(
+                sample_limit, merged[name]["samples"] + result[name]["samples"], key=order
+            )
+    return merged
+
+
+def build_report(ledger, contact_log, chunk_summary, partition_summary) -> Dict[str, Any]:
+    report = {
+        "ledger": ledger,
+        "lines": chunk_summary["lines"],
+        "records": chunk_summary["records"],
+        "formats": {"json": chunk_summary["json"], "csv": chunk_summary["csv"]},
+        "uniqueEmployees": partition_summary["uniqueEmployees"],
+        "malformed": {"count": chunk_summary["malformed"], "samples": chunk_summary["malformedSamples"]},
+        "duplicates": partition_summary["duplicates"],
+        "lotteryCollisions": partition_summary["lotteryCollisions"],
+    }
+    if contact_log:
+        report["contactLog"] = contact_log
+        report["missingContacts"] = partition_summary["missingContacts"]
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="AXCL 등록 파일 정합성 점검 및 대사")
+    parser.add_argument("ledger", help="등록 파일 경로 또는 s3://bucket/key")
+    parser.add_argument("--contact-log", help="Connect 컨택 로그 (CSV/JSONL, 경로 또는 s3://)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="프로세스 수")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="청크 바이트 크기")
+    parser.add_argument("--partitions", type=int, default=DEFAULT_PARTITIONS, help="spill 파티션 수")
+    parser.add_argument("--sample-limit", type=int, default=DEFAULT_SAMPLE_LIMIT, help="항목별 보고 최대 건수")
+    parser.add_argument("--work-dir", help="spill 파일 상위 디렉토리 (지정 시 실행별 하위 디렉토리를 만들고 삭제하지 않음)")
+    parser.add_argument("--output", help="보고서 JSON 파일 (없으면 표준 출력)")
+    args = parser.parse_args()
+
+    report = reconcile(
+        args.ledger,
+        contact_log=args.contact_log,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        partitions=args.partitions,
+        sample_limit=args.sample_limit,
+        work_dir=args.work_dir
+    )
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+AXCL 이벤트 일괄 사전 등록 테스트
+
+레코드 파싱(CSV/JSONL), 일괄 검증/중복 제외, 단일 쓰기 반영 검증
+"""
+
+import pytest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+
+# Lambda 함수 import를 위한 경로 설정
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda-functions'))
+
+import batch_registration
+from batch_registration import parse_lines, iter_rows, MalformedLine, BATCH_CONTACT_ID
+from registration_engine import (
+    InMemoryLedgerStore,
+    registered_ids,
+    digit_lottery_number,
+    STATUS_SUCCESS,
+    STATUS_DUPLICATE,
+    STATUS_INVALID_FORMAT,
+)
+
+
+class CountingStore(InMemoryLedgerStore):
+    """읽기/쓰기 횟수를 기록하는 메모리 저장소"""
+
+    def __init__(self, content=""):
+        super().__init__(content)
+        self.reads = 0
+        self.writes = 0
+
+    def read(self):
+        self.reads += 1
+        return super().read()
+
+    def write(self, content):
+        self.writes += 1
+        super().write(content)
+
+
+class TestParsing:
+    """레코드 파싱 테스트"""
+
+    def test_csv_with_header(self):
+        """헤더가 있는 CSV를 필드명으로 해석하는지 테스트"""
+        lines = ["customerPhone,employeeId", "+821012345678,1234", "", "+821087654321,5678"]
+
+        rows = list(iter_rows(parse_lines(lines)))
+
+        assert rows == [
+            ("1234", "+821012345678", BATCH_CONTACT_ID),
+            ("5678", "+821087654321", BATCH_CONTACT_ID),
+        ]
+
+    def test_csv_without_header(self):
+        """헤더 없는 CSV를 사번,전화번호,Contact ID 순서로 해석하는지 테스트"""
+        rows = list(iter_rows(parse_lines(["1234", "5678,+821012345678,c-1"])))
+
+        assert rows == [("1234", None, BATCH_CONTACT_ID), ("5678", "+821012345678", "c-1")]
+
+    def test_jsonl_detected(self):
+        """'{'로 시작하면 JSONL로 해석하는지 테스트"""
+        lines = ['{"사번": "1234"}', '{"employeeId": 5678, "contactId": "c-2"}']
+
+        rows = list(iter_rows(parse_lines(lines)))
+
+        assert rows == [("1234", None, BATCH_CONTACT_ID), ("5678", None, "c-2")]
+
+    def test_malformed_jsonl_line(self):
+        """JSON으로 해석할 수 없는 라인을 줄 번호와 함께 반환하는지 테스트"""
+        lines = ['', '{"employeeId": "1234"}', '{"employeeId": "56', '{"employeeId": "7890"}']
+
+        rows = list(iter_rows(parse_lines(lines)))
+
+        assert rows[0] == ("1234", None, BATCH_CONTACT_ID)
+        assert rows[1] == MalformedLine(3, '{"employeeId": "56')
+        assert rows[2] == ("7890", None, BATCH_CONTACT_ID)
+
+
+class TestBatchHandler:
+    """일괄 등록 핸들러 테스트"""
+
+    @pytest.fixture
+    def store(self):
+        store = CountingStore("2025-08-03T10:00:00+00:00,+821012345678,contact-123,1234\n")
+        with patch.object(batch_registration.engine, 'store', store):
+            yield store
+
+    def test_records_registered_with_single_write(self, store):
+        """기존/목록 내 중복과 형식 오류를 제외하고 한 번에 저장하는지 테스트"""
+        event = {"records": ["1234", "5678", {"employeeId": "5678"}, "12", "9012"]}
+
+        result = batch_registration.lambda_handler(event, None)
+
+        assert result["registrationStatus"] == "SUCCESS"
+        assert [r["registrationStatus"] for r in result["results"]] == [
+            STATUS_DUPLICATE, STATUS_SUCCESS, STATUS_DUPLICATE, STATUS_INVALID_FORMAT, STATUS_SUCCESS
+        ]
+        assert result["results"][1]["lotteryNumber"] == digit_lottery_number("5678")
+        assert result["summary"] == {"total": 5, "registered": 2, "duplicate": 2, "invalid": 1}
+        assert store.reads == 1
+        assert store.writes == 1
+        assert registered_ids(store.content) == {"1234", "5678", "9012"}
+
+    def test_results_preserve_order(self, store):
+        """결과가 입력 순서를 유지하고 한 번에 저장되는지 테스트"""
+        rows = [(f"{i:04d}", None, None) for i in range(2000, 2050)]
+
+        results = batch_registration.engine.register_batch(rows)
+
+        assert [r.registration.employee_id for r in results] == [row[0] for row in rows]
+        assert store.writes == 1
+
+    def test_s3_source_streamed(self, store):
+        """S3 원본 파일을 라인 스트림으로 읽는지 테스트"""
+        body = MagicMock()
+        body.iter_lines.return_value = [b'\xef\xbb\xbfemployeeId', b'3456', b'7890']
+
+        with patch.object(batch_registration.s3, 'get_object', return_value={'Body': body}) as get_object:
+            result = batch_registration.lambda_handler({"s3Key": "imports/hr.csv"}, None)
+
+        get_object.assert_called_once_with(Bucket="axcl", Key="imports/hr.csv")
+        assert result["summary"]["registered"] == 2
+
+    def test_malformed_line_reported_per_row(self, store):
+        """손상된 JSONL 라인이 있어도 나머지는 등록하고 해당 줄만 INVALID_FORMAT인지 테스트"""
+        event = {"body": '{"employeeId": "5678"}\n{"employeeId": \n{"employeeId": "9012"}\n', "format": "jsonl"}
+
+        result = batch_registration.lambda_handler(event, None)
+
+        assert result["registrationStatus"] == "SUCCESS"
+        assert [r["registrationStatus"] for r in result["results"]] == [
+            STATUS_SUCCESS, STATUS_INVALID_FORMAT, STATUS_SUCCESS
+        ]
+        assert result["results"][1]["lineNumber"] == 2
+        assert result["summary"]["invalid"] == 1
+        assert registered_ids(store.content) == {"1234", "5678", "9012"}
+
+    def test_empty_input(self, store):
+        """등록할 레코드가 없으면 INPUT_ERROR인지 테스트"""
+        result = batch_registration.lambda_handler({"body": "\n\n"}, None)
+
+        assert result["registrationStatus"] == "INPUT_ERROR"
+        assert store.writes == 0
+
+
+if __name__ == "__main__":
+    # pytest 실행
+    pytest.main([__file__, "-v"])
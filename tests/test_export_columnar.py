@@ -0,0 +1,142 @@
+"""
+AXCL 등록 데이터 컬럼형 내보내기 테스트
+
+혼합 형식 변환, 중복 처리, 전화번호 사전, mmap 기반 읽기 검증
+"""
+
+import pytest
+import sys
+import os
+from datetime import datetime, timezone
+
+# 스크립트 import를 위한 경로 설정
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from export_columnar import (
+    export,
+    read_ledger_lines,
+    to_epoch_micros,
+    ColumnarRegistrations,
+    TIMESTAMP_NULL,
+)
+from registration_engine import modulo_lottery_number, digit_lottery_number
+
+LEDGER_LINES = [
+    '{"contactId": "c-1", "timestamp": "2025-08-04T03:55:40.123456+00:00", "customerPhone": "+821023692910", "customerInput": "5869", "eventType": "lottery_registration"}\n',
+    "2025-08-04T04:00:00+00:00,+821012345678,c-2,01234\n",
+    "broken line\n",
+    "2025-08-04T04:01:00+00:00,+821023692910,c-3,7001\n",
+    "2025-08-04T04:02:00+00:00,+821012345678,c-4,01234\n",
+    "not-a-time,UNKNOWN,UNKNOWN,12345678\n",
+]
+
+
+@pytest.fixture
+def exported(tmp_path):
+    path = str(tmp_path / "registrations.axcol")
+    summary = export(LEDGER_LINES, path)
+    return path, summary
+
+
+class TestExport:
+    """컬럼형 변환 테스트"""
+
+    def test_summary(self, exported):
+        """첫 등록만 기록하고 손상/중복 건수를 집계하는지 테스트"""
+        _, summary = exported
+
+        assert summary["records"] == 4
+        assert summary["phones"] == 3
+        assert summary["skipped"] == {"malformed": 1, "duplicate": 1, "unsupported": 0}
+
+    def test_keep_duplicates(self, tmp_path):
+        """옵션 지정 시 중복 사번도 모두 기록하는지 테스트"""
+        path = str(tmp_path / "all.axcol")
+
+        summary = export(LEDGER_LINES, path, keep_duplicates=True)
+
+        assert summary["records"] == 5
+        with ColumnarRegistrations(path) as columns:
+            assert [columns.employee_id(i) for i in range(len(columns))].count("01234") == 2
+
+    def test_epoch_micros(self):
+        """ISO 시각을 UTC epoch 마이크로초로 변환하는지 테스트"""
+        assert to_epoch_micros("1970-01-01T00:00:01.5+00:00") == 1_500_000
+        assert to_epoch_micros("1970-01-01T09:00:00+09:00") == 0
+        assert to_epoch_micros("2025-08-04T03:55:40Z") == to_epoch_micros("2025-08-04T03:55:40+00:00")
+        assert to_epoch_micros("not-a-time") == TIMESTAMP_NULL
+
+    def test_reads_local_ledger(self, tmp_path):
+        """로컬 등록 파일을 라인 스트림으로 읽는지 테스트"""
+        ledger = tmp_path / "axcl_event.txt"
+        ledger.write_text("".join(LEDGER_LINES), encoding="utf-8")
+
+        assert list(read_ledger_lines(str(ledger))) == LEDGER_LINES
+
+
+class TestColumnarRegistrations:
+    """mmap 기반 읽기 테스트"""
+
+    def test_columns(self, exported):
+        """각 컬럼 값이 원본 등록과 일치하는지 테스트"""
+        path, _ = exported
+
+        with ColumnarRegistrations(path) as columns:
+            assert len(columns) == 4
+            assert [columns.employee_id(i) for i in range(4)] == ["5869", "01234", "7001", "12345678"]
+            # JSON 라인은 모듈로 방식, CSV 라인은 숫자 추출 방식 추첨번호
+            assert columns.lottery_number(0) == modulo_lottery_number("5869")
+            assert columns.lottery_number(1) == digit_lottery_number("01234")
+            assert columns.timestamp(0) == datetime(2025, 8, 4, 3, 55, 40, 123456, tzinfo=timezone.utc)
+            assert columns.timestamp(3) is None
+            assert [columns.phone(i) for i in range(4)] == ["+821023692910", "+821012345678", "+821023692910", ""]
+
+    def test_timestamp_round_trip_exact(self, tmp_path):
+        """float 변환 없이 마이크로초까지 정확히 복원하는지 테스트"""
+        path = str(tmp_path / "edge.axcol")
+        export(["9999-12-31T23:59:59.999999+00:00,+8210,c-1,1234\n"], path)
+
+        with ColumnarRegistrations(path) as columns:
+            assert columns.timestamp(0) == datetime(9999, 12, 31, 23, 59, 59, 999999, tzinfo=timezone.utc)
+
+    def test_zero_copy_views(self, exported):
+        """숫자 컬럼이 mmap 위의 읽기 전용 memoryview인지 테스트"""
+        path, _ = exported
+
+        with ColumnarRegistrations(path) as columns:
+            assert isinstance(columns.timestamps, memoryview)
+            assert columns.timestamps.readonly
+            assert columns.timestamps.format == "q"
+            assert list(columns.phone_codes) == [0, 1, 0, 2]
+
+    def test_draw_is_reproducible(self, exported):
+        """같은 시드로 같은 당첨자를 뽑는지 테스트"""
+        path, _ = exported
+
+        with ColumnarRegistrations(path) as columns:
+            first = columns.draw(2, seed=42)
+            assert first == columns.draw(2, seed=42)
+            assert len(set(first)) == 2
+            assert len(columns.draw(10)) == 4
+
+    def test_empty_export(self, tmp_path):
+        """등록이 없어도 빈 파일을 열 수 있는지 테스트"""
+        path = str(tmp_path / "empty.axcol")
+        export([], path)
+
+        with ColumnarRegistrations(path) as columns:
+            assert len(columns) == 0
+            assert columns.phones == []
+
+    def test_rejects_other_files(self, tmp_path):
+        """형식이 다른 파일은 거부하는지 테스트"""
+        path = tmp_path / "other.bin"
+        path.write_bytes(b"\0" * 128)
+
+        with pytest.raises(ValueError):
+            ColumnarRegistrations(str(path))
+
+
+if __name__ == "__main__":
+    # pytest 실행
+    pytest.main([__file__, "-v"])
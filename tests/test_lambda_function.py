@@ -14,6 +14,7 @@ import os
 # Lambda 함수 import를 위한 경로 설정
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda-functions'))
 
+import connect_event_registration
 from connect_event_registration import (
     lambda_handler,
     extract_contact_data,
@@ -26,18 +27,14 @@ from connect_event_registration import (
 class TestLambdaHandler:
     """Lambda 핸들러 테스트"""
     
-    @patch('boto3.client')
-    def test_successful_registration(self, mock_boto3_client):
+    def test_successful_registration(self):
         """정상적인 등록 프로세스 테스트"""
-        # S3 모킹 설정
-        mock_s3 = MagicMock()
-        mock_boto3_client.return_value = mock_s3
+        # S3 모킹 설정 (엔진 저장소는 import 시점에 만든 클라이언트를 사용하므로 메서드를 직접 교체)
+        s3 = connect_event_registration.s3
+        engine = connect_event_registration.engine
         
         # NoSuchKey 예외를 시뮬레이션 (새로운 등록)
-        from botocore.exceptions import ClientError
-        mock_s3.get_object.side_effect = ClientError(
-            {'Error': {'Code': 'NoSuchKey'}}, 'GetObject'
-        )
+        no_such_key = s3.exceptions.NoSuchKey({'Error': {'Code': 'NoSuchKey'}}, 'GetObject')
         
         # 테스트 이벤트
         event = {
@@ -55,7 +52,13 @@ class TestLambdaHandler:
         }
         
         # Lambda 함수 실행
-        result = lambda_handler(event, None)
+        with patch.object(s3, 'get_object', side_effect=no_such_key), \
+                patch.object(s3, 'put_object', return_value={'ETag': '"etag"'}) as put_object, \
+                patch.object(engine.store, '_etag', None), \
+                patch.object(engine.store, '_content', ""), \
+                patch.object(engine, '_ids_content', None), \
+                patch.object(engine, '_ids', set()):
+            result = lambda_handler(event, None)
         
         # 검증
         assert result["registrationStatus"] == "SUCCESS"
@@ -64,7 +67,7 @@ class TestLambdaHandler:
         assert result["errorMessage"] == ""
         
         # S3 put_object가 호출되었는지 확인
-        mock_s3.put_object.assert_called_once()
+        put_object.assert_called_once()
     
     @patch('boto3.client')
     def test_duplicate_registration(self, mock_boto3_client):
@@ -122,6 +125,17 @@ class TestLambdaHandler:
         assert result["registrationStatus"] == "INPUT_ERROR"
         assert "사번을 입력해주세요" in result["errorMessage"]
 
+    def test_warmup_event(self):
+        """워밍업 이벤트는 등록 없이 캐시 준비 결과를 반환하는지 테스트"""
+        with patch('connect_event_registration.engine') as mock_engine:
+            mock_engine.prime.return_value = {"primed": True, "primingMs": 12.5}
+            
+            result = lambda_handler({"warmup": True}, None)
+        
+        assert result["registrationStatus"] == "WARMUP"
+        assert result["primingMs"] == 12.5
+        mock_engine.register.assert_not_called()
+
 
 class TestDataExtraction:
     """데이터 추출 기능 테스트"""
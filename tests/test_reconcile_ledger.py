@@ -0,0 +1,154 @@
+"""
+AXCL 등록 파일 대사 도구 테스트
+
+청크 경계 처리, 중복/손상/추첨번호 충돌/누락 컨택 보고 검증
+"""
+
+import pytest
+import itertools
+import sys
+import os
+
+# 스크립트 import를 위한 경로 설정
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from reconcile_ledger import LocalSource, owned_lines, reconcile
+from registration_engine import digit_lottery_number
+
+
+def colliding_pair():
+    """숫자 추출 방식에서 같은 추첨번호를 받는 서로 다른 사번 한 쌍"""
+    seen = {}
+    for number in itertools.count(1000):
+        employee_id = str(number)
+        lottery = digit_lottery_number(employee_id)
+        if lottery in seen:
+            return seen[lottery], employee_id
+        seen[lottery] = employee_id
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    first, second = colliding_pair()
+    lines = [
+        '{"contactId": "c-1", "timestamp": "2025-08-04T03:55:40+00:00", "customerPhone": "+8210", "customerInput": "5869", "eventType": "lottery_registration"}',
+        "2025-08-04T04:00:00+00:00,+8210,c-2,7001",
+        "not a registration",
+        "2025-08-04T04:01:00+00:00,+8210,c-3,7001",
+        f"2025-08-04T04:02:00+00:00,+8210,c-4,{first}",
+        f"2025-08-04T04:03:00+00:00,+8210,c-5,{second}",
+        '{"contactId": "c-6", "customerIn',
+    ]
+    path = tmp_path / "axcl_event.txt"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path), (first, second)
+
+
+class TestOwnedLines:
+    """바이트 범위 청크 경계 테스트"""
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 7, 16, 1000])
+    def test_every_line_owned_once(self, tmp_path, chunk_size):
+        """청크 크기와 관계없이 모든 줄이 정확히 한 번씩 반환되는지 테스트"""
+        content = b"aa\nbbbb\n\nccccccc\nd"
+        path = tmp_path / "lines.txt"
+        path.write_bytes(content)
+        source = LocalSource(str(path))
+
+        found = []
+        for start in range(0, len(content), chunk_size):
+            found.extend(owned_lines(source, start, min(start + chunk_size, len(content)), len(content)))
+
+        assert found == [(0, b"aa"), (3, b"bbbb"), (8, b""), (9, b"ccccccc"), (17, b"d")]
+
+
+class TestReconcile:
+    """대사 보고서 테스트"""
+
+    def test_report_in_process(self, ledger, tmp_path):
+        """중복, 손상 라인, 추첨번호 충돌, 누락 컨택을 보고하는지 테스트"""
+        path, (first, second) = ledger
+        contact_log = tmp_path / "ctr.csv"
+        contact_log.write_text("\ufeffInitiationTimestamp,ContactId\n2025-08-04,c-1\n2025-08-04,c-2\n2025-08-04,c-lost\n")
+
+        report = reconcile(path, contact_log=str(contact_log), workers=1, chunk_size=50, partitions=4)
+
+        assert report["lines"] == 7
+        assert report["records"] == 5
+        assert report["formats"] == {"json": 1, "csv": 4}
+        assert report["uniqueEmployees"] == 4
+        assert report["malformed"]["count"] == 2
+        assert [sample["line"] for sample in report["malformed"]["samples"]][0] == "not a registration"
+        assert [item["employeeId"] for item in report["duplicates"]["samples"]] == ["7001"]
+        assert report["duplicates"]["samples"][0]["count"] == 2
+        assert {
+            tuple(item["employeeIds"]) for item in report["lotteryCollisions"]["samples"]
+        } >= {tuple(sorted([first, second]))}
+        assert report["missingContacts"] == {"count": 1, "samples": ["c-lost"]}
+
+    def test_process_pool_matches_in_process(self, ledger, tmp_path):
+        """프로세스 풀 실행 결과가 단일 프로세스 결과와 같은지 테스트"""
+        path, _ = ledger
+        contact_log = tmp_path / "ctr.jsonl"
+        contact_log.write_text('{"ContactId": "c-2"}\n{"ContactId": "c-9"}\n')
+
+        serial = reconcile(path, contact_log=str(contact_log), workers=1, chunk_size=40, partitions=3)
+        parallel = reconcile(path, contact_log=str(contact_log), workers=2, chunk_size=40, partitions=3)
+
+        assert parallel == serial
+        assert parallel["missingContacts"]["samples"] == ["c-9"]
+
+    def test_unrecognised_header_skipped(self, ledger, tmp_path):
+        """컬럼명을 알 수 없는 CSV 헤더를 누락 컨택으로 보고하지 않는지 테스트"""
+        path, _ = ledger
+        contact_log = tmp_path / "ctr.csv"
+        contact_log.write_text("Contact,Started\nc-1,2025-08-04\nc-lost,2025-08-04\n")
+
+        report = reconcile(path, contact_log=str(contact_log), workers=1, partitions=4)
+
+        assert report["missingContacts"] == {"count": 1, "samples": ["c-lost"]}
+
+    def test_samples_bounded(self, tmp_path):
+        """건수는 전체를 세고 샘플과 사번/오프셋 목록은 sample_limit으로 제한하는지 테스트"""
+        path = tmp_path / "axcl_event.txt"
+        path.write_text("".join(
+            f"2025-08-04T04:00:00+00:00,+8210,c-{i},{1000 + i % 50}\n" for i in range(400)
+        ))
+
+        report = reconcile(str(path), workers=1, chunk_size=512, partitions=4, sample_limit=3)
+
+        assert report["duplicates"]["count"] == 50
+        assert [item["employeeId"] for item in report["duplicates"]["samples"]] == ["1000", "1001", "1002"]
+        assert report["duplicates"]["samples"][0]["count"] == 8
+        assert len(report["duplicates"]["samples"][0]["offsets"]) == 3
+        assert len(report["lotteryCollisions"]["samples"]) <= 3
+        assert all(len(item["employeeIds"]) <= 3 for item in report["lotteryCollisions"]["samples"])
+
+    def test_reused_work_dir(self, ledger, tmp_path):
+        """같은 work_dir로 다시 실행해도 이전 실행의 spill 파일이 섞이지 않는지 테스트"""
+        path, _ = ledger
+        large = tmp_path / "large.txt"
+        large.write_text("".join(f"2025-08-04T04:00:00+00:00,+8210,c-{i},{2000 + i}\n" for i in range(200)))
+        work_dir = tmp_path / "work"
+
+        reconcile(str(large), workers=1, chunk_size=256, partitions=4, work_dir=str(work_dir))
+        report = reconcile(path, workers=1, chunk_size=50, partitions=4, work_dir=str(work_dir))
+
+        assert report["uniqueEmployees"] == 4
+        assert report["duplicates"]["count"] == 1
+        assert len(os.listdir(work_dir)) == 2
+
+    def test_empty_ledger(self, tmp_path):
+        """빈 등록 파일도 오류 없이 처리하는지 테스트"""
+        path = tmp_path / "empty.txt"
+        path.write_text("")
+
+        report = reconcile(str(path), workers=1)
+
+        assert report["records"] == 0
+        assert report["duplicates"]["count"] == 0
+
+
+if __name__ == "__main__":
+    # pytest 실행
+    pytest.main([__file__, "-v"])
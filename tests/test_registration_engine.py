@@ -0,0 +1,368 @@
+"""
+AXCL 이벤트 등록 공통 엔진 테스트
+
+정책(추출/검증/라인 형식/추첨번호)과 등록 파이프라인 검증
+"""
+
+import pytest
+import boto3
+from unittest.mock import patch, MagicMock
+from botocore.exceptions import ClientError
+import sys
+import os
+
+# Lambda 함수 import를 위한 경로 설정
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda-functions'))
+
+from registration_engine import (
+    RegistrationEngine,
+    ExtractionPolicy,
+    ValidationPolicy,
+    InMemoryLedgerStore,
+    S3LedgerStore,
+    is_warmup_event,
+    JSON_LINES,
+    CSV,
+    decode_line,
+    registered_ids,
+    is_registered_in,
+    modulo_lottery_number,
+    digit_lottery_number,
+    new_registration,
+    STATUS_SUCCESS,
+    STATUS_INPUT_ERROR,
+    STATUS_INVALID_FORMAT,
+    STATUS_DUPLICATE,
+)
+from spill_journal import SpillJournal, CircuitBreaker
+
+
+def make_engine(content="", codec=CSV, journal=None):
+    return RegistrationEngine(
+        store=InMemoryLedgerStore(content),
+        codec=codec,
+        lottery=digit_lottery_number,
+        validation=ValidationPolicy(min_length=3, max_length=8),
+        journal=journal
+    )
+
+
+class FailingStore:
+    """항상 실패하는 저장소 (호출 횟수 기록)"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def read(self):
+        self.calls += 1
+        raise Exception("store down")
+
+    def write(self, content):
+        self.calls += 1
+        raise Exception("store down")
+
+    def describe(self):
+        return "failing://ledger"
+
+
+class CountingStore(InMemoryLedgerStore):
+    """쓰기 횟수를 기록하는 메모리 저장소"""
+
+    def __init__(self, content=""):
+        super().__init__(content)
+        self.writes = 0
+
+    def write(self, content):
+        self.writes += 1
+        super().write(content)
+
+
+class TestExtractionPolicy:
+    """이벤트 경로 추출 테스트"""
+
+    policy = ExtractionPolicy(
+        input_paths=[('params', 'inputValue'), ('attrs', 'customerInput'), ('contact', 'SystemAttributes', 'StoredInput')],
+        phone_paths=[('contact', 'CustomerEndpoint', 'Address'), ('event', 'customerPhone')],
+        contact_id_paths=[('contact', 'ContactId'), ('event', 'contactId')]
+    )
+
+    def test_priority_and_nested_paths(self):
+        """앞선 경로가 비어 있으면 다음 경로를 사용하는지 테스트"""
+        event = {
+            "Details": {
+                "ContactData": {
+                    "ContactId": "contact-123",
+                    "CustomerEndpoint": {"Address": "+821012345678"},
+                    "Attributes": {"customerInput": "  "},
+                    "SystemAttributes": {"StoredInput": " 5678 "}
+                },
+                "Parameters": {"inputValue": ""}
+            }
+        }
+
+        result = self.policy.extract(event)
+
+        assert result == {
+            'customer_input': "5678",
+            'customer_phone': "+821012345678",
+            'contact_id': "contact-123"
+        }
+
+    def test_simple_format(self):
+        """Details 없는 단순 형식에서 이벤트 자체를 파라미터로 사용하는지 테스트"""
+        event = {"inputValue": 1234, "customerPhone": "+821087654321", "contactId": "c-1"}
+
+        result = self.policy.extract(event)
+
+        assert result['customer_input'] == "1234"
+        assert result['customer_phone'] == "+821087654321"
+        assert result['contact_id'] == "c-1"
+
+
+class TestCodecs:
+    """등록 파일 라인 형식 테스트"""
+
+    def test_round_trip(self):
+        """두 형식 모두 인코딩 후 같은 사번으로 해석되는지 테스트"""
+        registration = new_registration("01234", "+821012345678", "contact-1")
+
+        for codec in (JSON_LINES, CSV):
+            decoded = decode_line(codec.encode(registration))
+            assert decoded.employee_id == "01234"
+            assert decoded.contact_id == "contact-1"
+
+    def test_mixed_ledger(self):
+        """JSON/CSV가 섞인 등록 파일에서 사번을 모두 찾는지 테스트"""
+        content = (
+            '{"contactId": "c-1", "customerInput": "1234"}\n'
+            "2025-08-03T10:00:00+00:00,+821012345678,c-2,5678\n"
+            "garbage line\n"
+            "\n"
+        )
+
+        assert registered_ids(content) == {"1234", "5678"}
+        assert is_registered_in(content, "5678") is True
+        # 전화번호에만 포함된 숫자는 중복이 아님
+        assert is_registered_in(content, "0123") is False
+
+
+class TestLottery:
+    """추첨번호 방식 테스트"""
+
+    def test_schemes_are_stable(self):
+        """두 방식 모두 L + 4자리 숫자를 일관되게 생성하는지 테스트"""
+        for scheme in (modulo_lottery_number, digit_lottery_number):
+            number = scheme("1234")
+            assert number == scheme("1234")
+            assert number.startswith("L") and len(number) == 5 and number[1:].isdigit()
+
+
+class TestRegistrationEngine:
+    """등록 파이프라인 테스트"""
+
+    def test_register_success(self):
+        """정상 등록 시 저장 및 추첨번호 반환 테스트"""
+        engine = make_engine()
+
+        result = engine.register("1234", "+821012345678", "contact-1")
+
+        assert result.status == STATUS_SUCCESS
+        assert result.lottery_number == digit_lottery_number("1234")
+        assert engine.store.content.endswith(",+821012345678,contact-1,1234\n")
+
+    @pytest.mark.parametrize("employee_id, status", [
+        (None, STATUS_INPUT_ERROR),
+        ("", STATUS_INPUT_ERROR),
+        ("12", STATUS_INVALID_FORMAT),
+        ("123456789", STATUS_INVALID_FORMAT),
+        ("12a4", STATUS_INVALID_FORMAT),
+    ])
+    def test_register_rejects_invalid(self, employee_id, status):
+        """검증 실패 시 저장하지 않는지 테스트"""
+        engine = make_engine()
+
+        assert engine.register(employee_id).status == status
+        assert engine.store.content == ""
+
+    def test_register_duplicate_across_formats(self):
+        """다른 핸들러 형식으로 기록된 사번도 중복 처리하는지 테스트"""
+        engine = make_engine('{"customerInput": "1234"}\n', codec=CSV)
+
+        assert engine.register("1234").status == STATUS_DUPLICATE
+
+    def test_append_skips_existing(self):
+        """일괄 추가 시 이미 등록된 사번과 중복 사번을 제외하는지 테스트"""
+        engine = make_engine("2025-08-03T10:00:00+00:00,+8210,c-1,1234\n")
+
+        added = engine.append([new_registration("1234"), new_registration("5678"), new_registration("5678")])
+
+        assert [r.employee_id for r in added] == ["5678"]
+        assert registered_ids(engine.store.content) == {"1234", "5678"}
+
+    def test_store_failure_without_journal_raises(self):
+        """저널이 없으면 저장소 오류를 그대로 전달하는지 테스트"""
+        engine = make_engine()
+        engine.store = FailingStore()
+
+        with pytest.raises(Exception):
+            engine.register("1234")
+
+    def test_store_failure_with_journal_spills(self, tmp_path):
+        """저널이 있으면 저장소 오류 시 저널에 보존하고 SUCCESS인지 테스트"""
+        journal = SpillJournal(str(tmp_path / "spill.jsonl"))
+        engine = make_engine(journal=journal)
+        engine.store = FailingStore()
+        engine.breaker = CircuitBreaker(failure_threshold=5)
+
+        result = engine.register("1234")
+
+        assert result.status == STATUS_SUCCESS
+        assert [r["employee_id"] for r in journal.pending()] == ["1234"]
+        assert engine.register("1234").status == STATUS_DUPLICATE
+
+    @pytest.mark.parametrize("circuit_open", [False, True])
+    def test_outage_rejects_known_duplicate(self, tmp_path, circuit_open):
+        """저장소 장애 중에도 마지막으로 읽은 등록 파일의 사번은 저널에 넣지 않고 중복 처리하는지 테스트"""
+        journal = SpillJournal(str(tmp_path / "spill.jsonl"))
+        engine = make_engine("2025-08-03T10:00:00+00:00,+8210,c-1,1234\n", journal=journal)
+        engine.prime()
+        engine.store = FailingStore()
+        engine.breaker = CircuitBreaker(failure_threshold=1)
+        if circuit_open:
+            engine.breaker.record_failure()
+
+        assert engine.register("1234").status == STATUS_DUPLICATE
+        assert journal.has_pending() is False
+        assert engine.register("5678").status == STATUS_SUCCESS
+        assert [r["employee_id"] for r in journal.pending()] == ["5678"]
+
+    def test_store_failure_opens_circuit_per_attempt(self, tmp_path):
+        """보류분이 있어도 호출당 저장소 시도는 한 번이고 실패마다 브레이커에 기록되는지 테스트"""
+        journal = SpillJournal(str(tmp_path / "spill.jsonl"))
+        engine = make_engine(journal=journal)
+        engine.store = FailingStore()
+        engine.breaker = CircuitBreaker(failure_threshold=3)
+
+        for i, employee_id in enumerate(["1001", "1002", "1003"]):
+            engine.register(employee_id)
+            assert engine.store.calls == i + 1
+
+        assert engine.breaker.state == CircuitBreaker.OPEN
+        engine.register("1004")
+        assert engine.store.calls == 3
+        assert len(journal.pending()) == 4
+
+
+class TestWarmupAndCache:
+    """워밍업 및 사번 캐시 테스트"""
+
+    @pytest.mark.parametrize("event, expected", [
+        ({"warmup": True}, True),
+        ({"source": "serverless-plugin-warmup"}, True),
+        ({"source": "aws.events", "detail-type": "Scheduled Event"}, True),
+        ({"inputValue": "1234"}, False),
+        ({"Details": {"Parameters": {"warmup": True}}}, False),
+    ])
+    def test_is_warmup_event(self, event, expected):
+        """워밍업/핑 이벤트만 식별하는지 테스트"""
+        assert is_warmup_event(event) is expected
+
+    def test_prime_builds_id_cache(self):
+        """워밍업 시 등록 없이 사번 캐시를 준비하는지 테스트"""
+        engine = make_engine("2025-08-03T10:00:00+00:00,+8210,c-1,1234\n")
+        engine.store = CountingStore(engine.store.content)
+
+        report = engine.prime()
+
+        assert report["primed"] is True
+        assert report["cachedIds"] == 1
+        assert report["primingMs"] >= 0
+        assert engine.store.writes == 0
+        assert engine.register("1234").status == STATUS_DUPLICATE
+
+    def test_prime_reports_store_failure(self):
+        """저장소 오류 시 예외 대신 실패를 보고하는지 테스트"""
+        engine = make_engine()
+        engine.store = FailingStore()
+
+        report = engine.prime()
+
+        assert report["primed"] is False
+        assert "store down" in report["error"]
+
+    def test_prime_flushes_journal(self, tmp_path):
+        """워밍업 시 저널 보류분을 반영하는지 테스트"""
+        journal = SpillJournal(str(tmp_path / "spill.jsonl"))
+        journal.append(new_registration("1234")._asdict())
+        engine = make_engine(journal=journal)
+
+        report = engine.prime()
+
+        assert report["flushedRecords"] == 1
+        assert report["cachedIds"] == 1
+        assert journal.has_pending() is False
+
+    def test_prime_skips_flush_when_circuit_open(self, tmp_path):
+        """서킷이 열려 있으면 워밍업에서 저장소를 호출하지 않는지 테스트"""
+        journal = SpillJournal(str(tmp_path / "spill.jsonl"))
+        journal.append(new_registration("1234")._asdict())
+        engine = make_engine(journal=journal)
+        engine.store = FailingStore()
+        engine.breaker = CircuitBreaker(failure_threshold=1)
+        engine.breaker.record_failure()
+
+        report = engine.prime()
+
+        assert report["primed"] is False
+        assert engine.store.calls == 0
+        assert journal.has_pending() is True
+
+    def test_cache_updated_after_write(self):
+        """저장 후 재파싱 없이 캐시에 새 사번이 반영되는지 테스트"""
+        engine = make_engine()
+        engine.register("1234")
+
+        with patch('registration_engine.registered_ids') as parse:
+            assert engine.register("1234").status == STATUS_DUPLICATE
+            parse.assert_not_called()
+
+
+class TestS3LedgerStore:
+    """S3 등록 파일 조건부 읽기 테스트"""
+
+    @pytest.fixture
+    def client(self):
+        return boto3.client('s3', region_name='ap-northeast-2')
+
+    def test_not_modified_returns_cached_content(self, client):
+        """ETag가 같으면 304 응답에서 이전 내용을 그대로 반환하는지 테스트"""
+        body = MagicMock()
+        body.read.return_value = b"2025-08-03T10:00:00+00:00,+8210,c-1,1234\n"
+        not_modified = ClientError(
+            {'Error': {'Code': '304'}, 'ResponseMetadata': {'HTTPStatusCode': 304}}, 'GetObject'
+        )
+
+        store = S3LedgerStore(client, "axcl", "axcl_event.txt")
+        with patch.object(client, 'get_object', side_effect=[{'Body': body, 'ETag': '"abc"'}, not_modified]) as get_object:
+            first = store.read()
+            second = store.read()
+
+        assert second is first
+        assert get_object.call_args.kwargs['IfNoneMatch'] == '"abc"'
+
+    def test_write_refreshes_etag(self, client):
+        """쓰기 응답의 ETag로 다음 조건부 읽기를 하는지 테스트"""
+        store = S3LedgerStore(client, "axcl", "axcl_event.txt")
+
+        with patch.object(client, 'put_object', return_value={'ETag': '"new"'}):
+            store.write("line\n")
+
+        with patch.object(client, 'get_object') as get_object:
+            store.read()
+
+        assert get_object.call_args.kwargs['IfNoneMatch'] == '"new"'
+
+
+if __name__ == "__main__":
+    # pytest 실행
+    pytest.main([__file__, "-v"])
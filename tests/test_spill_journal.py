@@ -0,0 +1,230 @@
+"""
+S3 장애 대비 스필 저널 테스트
+
+저널 기록/플러시, 서킷 브레이커 상태 전이, S3 장애 시 핸들러 동작 검증
+"""
+
+import pytest
+import json
+from unittest.mock import patch, MagicMock
+import sys
+import os
+
+# Lambda 함수 import를 위한 경로 설정
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda-functions'))
+
+import lambda_function
+from spill_journal import SpillJournal, CircuitBreaker
+from registration_engine import new_registration
+
+
+class FakeClock:
+    """서킷 브레이커 시간 제어용 시계"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSpillJournal:
+    """저널 기록 및 플러시 테스트"""
+
+    def test_append_and_pending(self, tmp_path):
+        """기록한 레코드가 순서대로 조회되는지 테스트"""
+        journal = SpillJournal(str(tmp_path / "spill.jsonl"))
+        assert journal.has_pending() is False
+
+        journal.append({"customerInput": "1234"})
+        journal.append({"customerInput": "5678"})
+
+        assert journal.has_pending() is True
+        assert [r["customerInput"] for r in journal.pending()] == ["1234", "5678"]
+
+    def test_pending_skips_torn_line(self, tmp_path):
+        """중간에 잘린 라인은 무시하는지 테스트"""
+        path = tmp_path / "spill.jsonl"
+        path.write_text('{"customerInput": "1234"}\n{"customerIn', encoding="utf-8")
+
+        assert SpillJournal(str(path)).pending() == [{"customerInput": "1234"}]
+
+    def test_flush_in_batches(self, tmp_path):
+        """배치 크기만큼만 반영하고 나머지는 저널에 남기는지 테스트"""
+        journal = SpillJournal(str(tmp_path / "spill.jsonl"))
+        for i in range(5):
+            journal.append({"customerInput": str(1000 + i)})
+
+        written = []
+        flushed = journal.flush(written.extend, batch_size=3)
+
+        assert flushed == 3
+        assert [r["customerInput"] for r in written] == ["1000", "1001", "1002"]
+        assert [r["customerInput"] for r in journal.pending()] == ["1003", "1004"]
+
+    def test_flush_failure_keeps_records(self, tmp_path):
+        """writer 실패 시 재시도 없이 예외를 전달하고 저널을 유지하는지 테스트"""
+        journal = SpillJournal(str(tmp_path / "spill.jsonl"))
+        journal.append({"customerInput": "1234"})
+
+        writer = MagicMock(side_effect=Exception("S3 down"))
+
+        with pytest.raises(Exception):
+            journal.flush(writer)
+
+        assert writer.call_count == 1
+        assert journal.pending() == [{"customerInput": "1234"}]
+
+
+class TestCircuitBreaker:
+    """서킷 브레이커 상태 전이 테스트"""
+
+    def test_opens_after_threshold(self):
+        """연속 실패가 임계값에 도달하면 열리는지 테스트"""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=FakeClock())
+
+        breaker.record_failure()
+        assert breaker.allow_request() is True
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.allow_request() is False
+
+    def test_half_open_after_timeout(self):
+        """타임아웃 후 시험 호출을 허용하고 성공 시 닫히는지 테스트"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 10
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow_request() is True
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_failure_reopens(self):
+        """시험 호출 실패 시 즉시 다시 열리는지 테스트"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=clock)
+        for _ in range(3):
+            breaker.record_failure()
+
+        clock.now = 10
+        assert breaker.allow_request() is True
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+
+class TestHandlerSpill:
+    """S3 장애 시 lambda_function 핸들러 동작 테스트"""
+
+    @pytest.fixture
+    def journal(self, tmp_path):
+        journal = SpillJournal(str(tmp_path / "spill.jsonl"))
+        # 모듈 수준 엔진의 사번 캐시가 앞선 테스트의 등록 파일 내용을 갖지 않도록 초기화
+        with patch.object(lambda_function.engine, 'journal', journal), \
+                patch.object(lambda_function.engine, 'breaker', CircuitBreaker()), \
+                patch.object(lambda_function.engine, '_ids_content', None), \
+                patch.object(lambda_function.engine, '_ids', set()):
+            yield journal
+
+    def make_event(self, employee_id):
+        return {
+            "Details": {
+                "ContactData": {
+                    "ContactId": f"contact-{employee_id}",
+                    "CustomerEndpoint": {"Address": "+821012345678"}
+                },
+                "Parameters": {"inputValue": employee_id}
+            }
+        }
+
+    def test_s3_failure_spills_record(self, journal):
+        """S3 실패 시 레코드가 저널에 보존되는지 테스트"""
+        with patch.object(lambda_function.s3, 'get_object', side_effect=Exception("S3 down")):
+            result = lambda_function.lambda_handler(self.make_event("1234"), None)
+
+        assert result["registrationStatus"] == "SUCCESS"
+        assert [r["employee_id"] for r in journal.pending()] == ["1234"]
+
+    def test_spilled_record_blocks_duplicate(self, journal):
+        """저널에 보류 중인 사번은 중복으로 처리하는지 테스트"""
+        journal.append(new_registration("1234")._asdict())
+
+        result = lambda_function.lambda_handler(self.make_event("1234"), None)
+
+        assert result["registrationStatus"] == "DUPLICATE"
+
+    def test_warm_invocation_flushes_journal(self, journal):
+        """S3 복구 후 호출에서 저널이 S3로 반영되는지 테스트"""
+        journal.append(new_registration("1234", "+821012345678", "contact-1234")._asdict())
+
+        stored = {"content": b""}
+
+        def get_object(**kwargs):
+            body = MagicMock()
+            body.read.return_value = stored["content"]
+            return {"Body": body}
+
+        def put_object(**kwargs):
+            stored["content"] = kwargs["Body"]
+            return {}
+
+        with patch.object(lambda_function.s3, 'get_object', side_effect=get_object), \
+                patch.object(lambda_function.s3, 'put_object', side_effect=put_object):
+            result = lambda_function.lambda_handler(self.make_event("5678"), None)
+
+        assert result["registrationStatus"] == "SUCCESS"
+        assert journal.has_pending() is False
+        lines = stored["content"].decode('utf-8').strip().split('\n')
+        assert [json.loads(line)["customerInput"] for line in lines] == ["1234", "5678"]
+
+    def test_open_circuit_skips_s3(self, journal):
+        """서킷이 열려 있으면 S3 호출 없이 저널에 기록하는지 테스트"""
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.record_failure()
+
+        with patch.object(lambda_function.engine, 'breaker', breaker), \
+                patch.object(lambda_function.s3, 'get_object') as get_object:
+            result = lambda_function.lambda_handler(self.make_event("1234"), None)
+
+        get_object.assert_not_called()
+        assert result["registrationStatus"] == "SUCCESS"
+        assert journal.has_pending() is True
+
+    def test_only_journal_client_fails_fast(self):
+        """저널이 있는 핸들러만 SDK 재시도 없이 짧은 타임아웃을 쓰는지 테스트"""
+        import connect_event_registration
+
+        assert lambda_function.s3.meta.config.retries['total_max_attempts'] == 1
+        assert lambda_function.s3.meta.config.read_timeout == 2
+        assert connect_event_registration.s3.meta.config.retries.get('total_max_attempts', 2) > 1
+
+    def test_warmup_flushes_journal(self, journal):
+        """등록 호출 없이 워밍업/핑 호출만 와도 저널이 반영되는지 테스트"""
+        journal.append(new_registration("1234", "+821012345678", "contact-1234")._asdict())
+
+        stored = {"content": b""}
+
+        def get_object(**kwargs):
+            body = MagicMock()
+            body.read.return_value = stored["content"]
+            return {"Body": body}
+
+        def put_object(**kwargs):
+            stored["content"] = kwargs["Body"]
+            return {}
+
+        with patch.object(lambda_function.s3, 'get_object', side_effect=get_object), \
+                patch.object(lambda_function.s3, 'put_object', side_effect=put_object):
+            result = lambda_function.lambda_handler({"warmup": True}, None)
+
+        assert result["registrationStatus"] == "WARMUP"
+        assert result["flushedRecords"] == 1
+        assert journal.has_pending() is False
+        assert json.loads(stored["content"].decode('utf-8'))["customerInput"] == "1234"
+
+
+if __name__ == "__main__":
+    # pytest 실행
+    pytest.main([__file__, "-v"])